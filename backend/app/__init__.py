@@ -19,16 +19,26 @@ def create_app(config_class=Config):
     # ✅ Register routes
     register_blueprints(app)
 
+    # ✅ Register maintenance CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+
     # ✅ Register models and (optionally) create tables
     with app.app_context():
         from app.models import (
-            user, book, summary, review,
-            bookclub, meeting, invite, membership
+            user, book, book_genre, book_rating_stats, book_similarity, summary,
+            review, bookclub, meeting, invite, membership, job_watermark,
+            reading_progress, club_event, club_daily_stats, club_trending_score,
+            timeline_entry
         )
 
         if not app.config.get('MIGRATIONS_ENABLED', True):
             db.create_all()
 
+    # ✅ Bridge live club streams across workers (no-op unless PUBSUB_PG_NOTIFY)
+    from app.services.pubsub import init_pubsub
+    init_pubsub(app)
+
     return app
 
 def register_blueprints(app):
@@ -45,6 +55,7 @@ def register_blueprints(app):
     from app.routes.invite_routes import invite_bp
     from app.routes.following_routes import following_bp
     from app.routes.profile_routes import profile_bp
+    from app.routes.feed_routes import feed_bp
 
     app.register_blueprint(book_bp, url_prefix='/books')
     app.register_blueprint(summary_bp, url_prefix='/summaries')
@@ -57,6 +68,7 @@ def register_blueprints(app):
     app.register_blueprint(membership_bp, url_prefix='/memberships')
     app.register_blueprint(invite_bp, url_prefix='/invites')
     app.register_blueprint(admin_bp, url_prefix='/admin')
+    app.register_blueprint(feed_bp, url_prefix='/feed')
     app.register_blueprint(profile_bp)
 
     @app.route('/api/health')
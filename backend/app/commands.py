@@ -0,0 +1,144 @@
+"""Maintenance commands, run with ``flask --app app.py <group> <command>``."""
+import click
+from flask.cli import AppGroup
+
+from app.extensions import db
+
+books_cli = AppGroup('books', help='Book catalog maintenance.')
+clubs_cli = AppGroup('clubs', help='Book club maintenance.')
+users_cli = AppGroup('users', help='User maintenance.')
+feed_cli = AppGroup('feed', help='Home feed maintenance.')
+
+
+@books_cli.command('rebuild-rating-stats')
+def rebuild_rating_stats():
+    """Recompute book_rating_stats from the reviews table."""
+    from app.models.book_rating_stats import BookRatingStats
+
+    BookRatingStats.rebuild()
+    db.session.commit()
+    count = db.session.query(BookRatingStats).count()
+    click.echo(f'Rebuilt rating stats for {count} books')
+
+
+@books_cli.command('build-similar')
+@click.option('--incremental', is_flag=True, help='Only recompute books affected by reads since the last run.')
+@click.option('--top-k', default=20, show_default=True, help='Neighbours stored per book.')
+@click.option('--min-co-readers', default=2, show_default=True, help='Readers two books must share to be related.')
+def build_similar(incremental, top_k, min_co_readers):
+    """Rebuild the "readers also liked" book_similarities table."""
+    from app.services.recommendations import build_similarities
+
+    result = build_similarities(incremental=incremental, k=top_k, min_co_readers=min_co_readers)
+    click.echo(
+        f"{result['mode'].capitalize()} build: recomputed {result['books_recomputed']} books, "
+        f"wrote {result['rows_written']} rows"
+    )
+
+
+@clubs_cli.command('reconcile-member-counts')
+def reconcile_member_counts():
+    """Recount bookclubs.member_count from the memberships table."""
+    from app.models.bookclub import BookClub
+
+    corrected = BookClub.reconcile_member_counts()
+    db.session.commit()
+    click.echo(f'Corrected member counts for {corrected} clubs')
+
+
+@clubs_cli.command('refresh-stats')
+@click.option('--full', is_flag=True, help='Rebuild club_daily_stats from scratch.')
+def refresh_stats(full):
+    """Roll recent club activity into club_daily_stats; run every few minutes."""
+    from app.services.club_stats import refresh_club_stats
+
+    touched = refresh_club_stats(full=full)
+    click.echo(', '.join(f'{name}: {count} days' for name, count in touched.items()))
+
+
+@clubs_cli.command('update-trending')
+@click.option('--full', is_flag=True, help='Replay every club event into an empty table.')
+def update_trending(full):
+    """Fold new club events into the decayed club_trending_scores."""
+    from flask import current_app
+    from app.services.trending import update_trending as run_update
+
+    result = run_update(current_app.config['TRENDING_HALF_LIFE_HOURS'], full=full)
+    click.echo(
+        f"Folded {result['events']} events into {result['clubs_updated']} clubs, "
+        f"pruned {result['clubs_pruned']}"
+    )
+
+
+@clubs_cli.command('purge-deleting')
+def purge_deleting():
+    """Finish deleting clubs left part-way through a background deletion."""
+    from app.models.bookclub import BookClub
+    from app.services.club_deletion import DELETING_STATUS, delete_club_chunked
+
+    club_ids = db.session.scalars(db.select(BookClub.id).where(BookClub.status == DELETING_STATUS)).all()
+    for club_id in club_ids:
+        removed = delete_club_chunked(club_id)
+        click.echo(f'Deleted club {club_id}: {removed}')
+    click.echo(f'Purged {len(club_ids)} clubs')
+
+
+@users_cli.command('reconcile-follow-counts')
+def reconcile_follow_counts():
+    """Recount users.followers_count and following_count from the follows table."""
+    from app.models.user import User
+
+    corrected = User.reconcile_follow_counts()
+    db.session.commit()
+    click.echo(f'Corrected follow counts for {corrected} users')
+
+
+@feed_cli.command('rebuild')
+@click.option('--days', default=30, show_default=True, help='Age of the newest items to re-materialize.')
+def rebuild_feed(days):
+    """Copy recent summaries and reviews into any follower timelines missing them."""
+    from app.services.timeline import rebuild_timelines
+
+    written = rebuild_timelines(days)
+    db.session.commit()
+    click.echo(f'Wrote {written} timeline entries')
+
+
+@feed_cli.command('benchmark')
+@click.option('--users', default=2000, show_default=True, help='Synthetic users.')
+@click.option('--follows', 'follows_per_user', default=50, show_default=True, help='Regular follows per user.')
+@click.option('--celebrities', default=3, show_default=True, help='Users every synthetic user follows.')
+@click.option('--posts', default=1000, show_default=True, help='Summaries posted.')
+@click.option('--reads', default=200, show_default=True, help='Readers whose feed is fetched.')
+@click.option('--limit', default=20, show_default=True, help='Feed page size.')
+@click.option('--max-followers', type=int, default=None,
+              help='Fan-out threshold; defaults to FEED_FANOUT_MAX_FOLLOWERS.')
+def benchmark_feed(users, follows_per_user, celebrities, posts, reads, limit, max_followers):
+    """Measure feed write amplification and read latency on synthetic data, then roll back."""
+    from flask import current_app
+    from app.services.timeline_benchmark import run_benchmark
+
+    if max_followers is None:
+        max_followers = current_app.config['FEED_FANOUT_MAX_FOLLOWERS']
+    result = run_benchmark(users, follows_per_user, celebrities, posts, reads, limit, max_followers)
+    click.echo(
+        f"{result['users']} users, {result['follows']} follows, "
+        f"{result['pulled_authors']} authors read on demand (over {max_followers} followers)"
+    )
+    click.echo(
+        f"Writes: {result['posts']} posts, {result['timeline_rows']} timeline rows "
+        f"({result['rows_per_post']} per post), p50 {result['write'].get('p50_ms')} ms, "
+        f"p95 {result['write'].get('p95_ms')} ms"
+    )
+    for page in ('first_page', 'next_page'):
+        click.echo(
+            f"Reads ({page.replace('_', ' ')}): p50 {result[page].get('p50_ms')} ms, "
+            f"p95 {result[page].get('p95_ms')} ms"
+        )
+
+
+def register_commands(app):
+    app.cli.add_command(books_cli)
+    app.cli.add_command(clubs_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(feed_cli)
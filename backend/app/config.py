@@ -22,5 +22,38 @@ class Config:
     DEBUG = os.getenv('FLASK_DEBUG', 'False') == 'True'
     TESTING = False
     
+    # Cover Thumbnail Cache
+    COVER_CACHE_DIR = os.getenv('COVER_CACHE_DIR')  # Defaults to <instance>/covers
+    COVER_CACHE_MAX_BYTES = int(os.getenv('COVER_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    COVER_WORKERS = int(os.getenv('COVER_WORKERS', 4))
+    COVER_FETCHER = None  # Callable(url) -> bytes; tests swap in a local stub
+
+    # Duplicate Detection
+    BOOK_DUPLICATE_THRESHOLD = float(os.getenv('BOOK_DUPLICATE_THRESHOLD', 0.8))
+
+    # Reading Progress (seconds between batched writes; 0 writes each ping immediately)
+    PROGRESS_FLUSH_INTERVAL = float(os.getenv('PROGRESS_FLUSH_INTERVAL', 5.0))
+    PROGRESS_MAX_PENDING = int(os.getenv('PROGRESS_MAX_PENDING', 10000))
+
+    # Seconds clients and proxies may reuse /bookclubs/<id>/stats (refreshed by a batch job)
+    CLUB_STATS_MAX_AGE = int(os.getenv('CLUB_STATS_MAX_AGE', 300))
+
+    # Trending clubs: activity loses half its weight every this many hours
+    TRENDING_HALF_LIFE_HOURS = float(os.getenv('TRENDING_HALF_LIFE_HOURS', 48))
+
+    # Seconds before the in-memory follow graph is reloaded from the follows table
+    SOCIAL_GRAPH_MAX_AGE = float(os.getenv('SOCIAL_GRAPH_MAX_AGE', 600))
+
+    # Home feed: items by authors with more followers are read on demand, not copied to timelines
+    FEED_FANOUT_MAX_FOLLOWERS = int(os.getenv('FEED_FANOUT_MAX_FOLLOWERS', 5000))
+
+    # Clubs with at least this many members are deleted by a background job
+    CLUB_DELETE_BACKGROUND_THRESHOLD = int(os.getenv('CLUB_DELETE_BACKGROUND_THRESHOLD', 5000))
+
+    # Live Club Streams (SSE)
+    SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', 15))
+    # Fan club events out across workers through PostgreSQL LISTEN/NOTIFY
+    PUBSUB_PG_NOTIFY = os.getenv('PUBSUB_PG_NOTIFY', 'False') == 'True'
+
     # CORS Configuration (if needed)
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '').split(',') if os.getenv('CORS_ORIGINS') else []
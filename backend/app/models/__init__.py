@@ -3,13 +3,22 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 from .book import Book
+from .book_genre import BookGenre
+from .book_rating_stats import BookRatingStats
+from .book_similarity import BookSimilarity
 from .summary import Summary
 from .review import Review
 from .bookclub import BookClub
 from .membership import Membership
+from .club_event import ClubEvent
 from .user import User
 from .following import follows
 from .invite import Invite, InviteStatus
 from .meeting import Meeting
+from .job_watermark import JobWatermark
+from .reading_progress import ReadingProgress
+from .club_daily_stats import ClubDailyStats
+from .club_trending_score import ClubTrendingScore
+from .timeline_entry import TimelineEntry
 
-__all__ = ['db', 'User', 'Book', 'Summary', 'BookClub', 'Membership', 'follows', 'Review', 'Meeting', 'Invite', 'InviteStatus']
+__all__ = ['db', 'User', 'Book', 'BookGenre', 'BookRatingStats', 'BookSimilarity', 'Summary', 'BookClub', 'Membership', 'ClubEvent', 'follows', 'Review', 'Meeting', 'Invite', 'InviteStatus', 'JobWatermark', 'ReadingProgress', 'ClubDailyStats', 'ClubTrendingScore', 'TimelineEntry']
@@ -1,7 +1,17 @@
+import ipaddress
+import re
+import unicodedata
 from datetime import datetime
+from urllib.parse import urlparse
 from app.extensions import db  # ✅ CORRECT
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy import event
+from sqlalchemy.orm import deferred, validates
 from .review import Review
+from .book_genre import BookGenre
+from .book_rating_stats import BookRatingStats
+
+MAX_URL_LENGTH = 2048
 
 class Book(db.Model):
     __tablename__ = 'books'
@@ -13,16 +23,141 @@ class Book(db.Model):
     synopsis = db.Column(db.Text, nullable=True)
     date_published = db.Column(db.DateTime, nullable=True)
     cover_image_url = db.Column(db.String, nullable=True)
-    date_added = db.Column(db.DateTime, default=datetime.utcnow)
+    date_added = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     rating = db.Column(db.Float, nullable=True)
     language = db.Column(db.String(50), nullable=True)
     pages = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # Canonical "title|author" used for duplicate detection; see Book.duplicate_key
+    normalized_key = db.Column(db.String(255), nullable=True)
+    # Maintained by a database trigger on PostgreSQL; unused elsewhere
+    search_vector = deferred(db.Column(TSVECTOR().with_variant(db.Text(), 'sqlite'), nullable=True))
+
+    # Indexes backing the keyset-paginated catalog and its filters
+    __table_args__ = (
+        db.Index('ix_books_date_added_id', 'date_added', 'id'),
+        db.Index('ix_books_language', 'language'),
+        db.Index('ix_books_pages', 'pages'),
+        db.Index('ix_books_rating', 'rating'),
+        db.Index('ix_books_search_vector', 'search_vector', postgresql_using='gin'),
+        # A pg_trgm GIN index on normalized_key is created by migration on PostgreSQL
+        db.Index('ix_books_normalized_key', 'normalized_key'),
+    )
 
     # Define relationships here after both classes have been defined
     #summaries = db.relationship('Summary', back_populates='book', cascade='all, delete-orphan')
 
     # Use a string reference to the 'Review' class to avoid circular imports
     reviews = db.relationship('Review', back_populates='book', cascade='all, delete-orphan')
+    genre_links = db.relationship('BookGenre', cascade='all, delete-orphan')
+    # Joined eagerly so serializing a page of books needs no extra queries
+    rating_stats = db.relationship('BookRatingStats', uselist=False, lazy='joined', cascade='all, delete-orphan')
+
+    @staticmethod
+    def normalize_genres(genres):
+        """Clean a genres payload into a de-duplicated list of names"""
+        if not genres:
+            return []
+        if isinstance(genres, str):
+            genres = genres.split(',')
+        elif not isinstance(genres, (list, tuple)):
+            raise ValueError("Field genres must be a list or a comma-separated string")
+        cleaned, seen = [], set()
+        for genre in genres:
+            name = ' '.join(str(genre).split())[:50]
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                cleaned.append(name)
+        return cleaned
+
+    @staticmethod
+    def validate_cover_url(url):
+        """Raise ValueError unless url is an http(s) URL on a public host"""
+        if not isinstance(url, str) or len(url) > MAX_URL_LENGTH:
+            raise ValueError(f"Field cover_image_url must be a URL of {MAX_URL_LENGTH} characters or less")
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise ValueError("Field cover_image_url must be an http or https URL")
+        host = parsed.hostname.rstrip('.').lower()
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            address = None
+        if host == 'localhost' or host.endswith('.localhost') or (address is not None and not address.is_global):
+            raise ValueError("Field cover_image_url must point to a public host")
+        return url
+
+    @staticmethod
+    def duplicate_key(title, author):
+        """Canonical form of title and author that ignores case, accents,
+        punctuation, subtitles and leading articles"""
+        title = _SUBTITLE.split(title or '', maxsplit=1)[0]
+        title = _LEADING_ARTICLE.sub('', _clean_text(title))
+        # Join runs of initials so "J. R. R." and "J.R.R." agree
+        author = _INITIALS.sub(lambda m: m.group(0).replace(' ', ''), _clean_text(author))
+        author = ' '.join(sorted(author.split()))
+        return f'{title}|{author}'[:255]
+
+    @staticmethod
+    def full_title_key(title):
+        """Title normalized like duplicate_key but keeping the subtitle, so
+        "Dune: Part One" and "Dune: Part Two" stay apart"""
+        return _LEADING_ARTICLE.sub('', _clean_text(title))
+
+    @classmethod
+    def parse_payload(cls, data):
+        """Validate a create payload into column values; raises ValueError on bad input"""
+        if not isinstance(data, dict):
+            raise ValueError("Book payload must be an object")
+        for field in ('title', 'author'):
+            if field not in data:
+                raise ValueError(f"Missing required field: {field}")
+            if not isinstance(data[field], str) or not data[field].strip():
+                raise ValueError(f"Field {field} must be a non-empty string")
+            if len(data[field]) > 100:
+                raise ValueError(f"Field {field} must be 100 characters or less")
+
+        fields = {
+            'title': data['title'],
+            'author': data['author'],
+            'genres': cls.normalize_genres(data.get('genres', [])),
+            'synopsis': _optional_string(data, 'synopsis'),
+            'rating': _optional_number(data, 'rating', float),
+            'language': _optional_string(data, 'language', max_length=50),
+            'pages': _optional_number(data, 'pages', int),
+            'date_published': _optional_date(data, 'date_published'),
+            'cover_image_url': _optional_url(data, 'cover_image_url'),
+            'normalized_key': cls.duplicate_key(data['title'], data['author'])
+        }
+        # Left out when absent so inserts use the column default and upserts keep the original
+        date_added = _optional_date(data, 'date_added')
+        if date_added:
+            fields['date_added'] = date_added
+        return fields
+
+    @validates('genres')
+    def _sync_genre_links(self, key, genres):
+        """Keep the book_genres facet rows in sync whenever genres is assigned"""
+        genres = self.normalize_genres(genres)
+        existing = {link.genre: link for link in self.genre_links}
+        self.genre_links = [existing.get(name) or BookGenre(genre=name) for name in genres]
+        return genres
+
+    @property
+    def version(self):
+        """When this book or its review aggregates last changed"""
+        stats_updated_at = self.rating_stats.updated_at if self.rating_stats else None
+        return max(filter(None, (self.updated_at, stats_updated_at)))
+
+    @classmethod
+    def version_of(cls, book_id):
+        """Same as Book.version, from a column-only query; None if the book doesn't exist"""
+        row = db.session.execute(
+            db.select(cls.updated_at, BookRatingStats.updated_at)
+            .outerjoin(BookRatingStats, BookRatingStats.book_id == cls.id)
+            .where(cls.id == book_id)
+        ).first()
+        return max(filter(None, row)) if row else None
 
     def to_dict(self):
         return {
@@ -36,8 +171,69 @@ class Book(db.Model):
             "date_added": self.date_added.isoformat() if self.date_added else None,
             "rating": self.rating,
             "language": self.language,
-            "pages": self.pages
+            "pages": self.pages,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            **(self.rating_stats.to_dict() if self.rating_stats else {
+                "review_count": 0,
+                "average_rating": None,
+                "rating_histogram": {str(value): 0 for value in range(1, 6)}
+            })
         }
 
     def __repr__(self):
         return f'<Book {self.title} by {self.author}>'
+
+
+def _clean_text(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return ' '.join(_NON_WORD.sub(' ', text.replace('.', '').replace("'", '')).split())
+
+_SUBTITLE = re.compile(r'\s*(?::|\s-\s|\(|\[)')
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+_LEADING_ARTICLE = re.compile(r'^(the|a|an) ')
+_INITIALS = re.compile(r'\b\w(?: \w\b)+')
+
+@event.listens_for(Book, 'before_insert')
+@event.listens_for(Book, 'before_update')
+def _refresh_normalized_key(mapper, connection, target):
+    target.normalized_key = Book.duplicate_key(target.title, target.author)
+
+def _optional_string(data, field, max_length=None):
+    value = data.get(field)
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Field {field} must be a string")
+    if max_length is not None and len(value) > max_length:
+        raise ValueError(f"Field {field} must be {max_length} characters or less")
+    return value
+
+def _optional_url(data, field):
+    url = _optional_string(data, field, max_length=MAX_URL_LENGTH)
+    return Book.validate_cover_url(url) if url else None
+
+def _optional_number(data, field, cast):
+    value = data.get(field)
+    if value is None or value == '':
+        return None
+    try:
+        number = cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Field {field} must be a number")
+    if cast is int and isinstance(value, float) and value != number:
+        raise ValueError(f"Field {field} must be a whole number")
+    return number
+
+def _optional_date(data, field):
+    value = data.get(field)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise ValueError(f"Field {field} must be a date in YYYY-MM-DD format")
+
+
+# Case-insensitive author lookups
+db.Index('ix_books_author_lower', db.func.lower(Book.author))
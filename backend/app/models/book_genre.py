@@ -0,0 +1,16 @@
+from app.extensions import db
+
+
+class BookGenre(db.Model):
+    """Normalized copy of Book.genres so genres can be indexed and counted in SQL"""
+    __tablename__ = 'book_genres'
+
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id', ondelete='CASCADE'), primary_key=True)
+    genre = db.Column(db.String(50), primary_key=True)
+
+    __table_args__ = (
+        db.Index('ix_book_genres_genre_book_id', 'genre', 'book_id'),
+    )
+
+    def __repr__(self):
+        return f'<BookGenre {self.book_id}: {self.genre}>'
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from app.extensions import db
+from app.utils import dialect_insert
+
+RATING_VALUES = range(1, 6)
+
+
+class BookRatingStats(db.Model):
+    """Running review aggregates per book, maintained alongside review writes"""
+    __tablename__ = 'book_rating_stats'
+
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id', ondelete='CASCADE'), primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_1 = db.Column(db.Integer, nullable=False, default=0)
+    rating_2 = db.Column(db.Integer, nullable=False, default=0)
+    rating_3 = db.Column(db.Integer, nullable=False, default=0)
+    rating_4 = db.Column(db.Integer, nullable=False, default=0)
+    rating_5 = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @property
+    def average_rating(self):
+        return round(self.rating_sum / self.review_count, 2) if self.review_count else None
+
+    @property
+    def histogram(self):
+        return {str(value): getattr(self, f'rating_{value}') for value in RATING_VALUES}
+
+    @classmethod
+    def apply(cls, book_id, added=None, removed=None):
+        """Atomically add and/or remove one rating in the current transaction.
+
+        Issues a single upsert of deltas, so concurrent review writes never
+        lose updates and no stats row needs to be read first.
+        """
+        deltas = {
+            'review_count': (added is not None) - (removed is not None),
+            'rating_sum': (added or 0) - (removed or 0),
+        }
+        for value in RATING_VALUES:
+            deltas[f'rating_{value}'] = (added == value) - (removed == value)
+
+        table = cls.__table__
+        stmt = dialect_insert(table).values(book_id=book_id, updated_at=datetime.utcnow(), **deltas)
+        set_ = {column: table.c[column] + stmt.excluded[column] for column in deltas}
+        set_['updated_at'] = stmt.excluded.updated_at
+        stmt = stmt.on_conflict_do_update(index_elements=[table.c.book_id], set_=set_)
+        db.session.execute(stmt)
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every row from the reviews table with set-based SQL"""
+        from .review import Review
+
+        columns = [
+            Review.book_id,
+            db.func.count(),
+            db.func.sum(Review.rating),
+        ] + [
+            db.func.sum(db.case((Review.rating == value, 1), else_=0)) for value in RATING_VALUES
+        ] + [
+            db.literal(datetime.utcnow(), db.DateTime)
+        ]
+        aggregate = db.select(*columns).where(Review.rating.between(1, 5)).group_by(Review.book_id)
+
+        table = cls.__table__
+        db.session.execute(table.delete())
+        db.session.execute(table.insert().from_select(
+            ['book_id', 'review_count', 'rating_sum'] + [f'rating_{value}' for value in RATING_VALUES] + ['updated_at'],
+            aggregate
+        ))
+
+    def to_dict(self):
+        return {
+            'review_count': self.review_count,
+            'average_rating': self.average_rating,
+            'rating_histogram': self.histogram
+        }
+
+    def __repr__(self):
+        return f'<BookRatingStats book={self.book_id} count={self.review_count}>'
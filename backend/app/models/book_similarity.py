@@ -0,0 +1,15 @@
+from app.extensions import db
+
+
+class BookSimilarity(db.Model):
+    """Top-K "readers also liked" neighbours per book, written by the offline
+    ``flask books build-similar`` job"""
+    __tablename__ = 'book_similarities'
+
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.SmallInteger, primary_key=True)
+    similar_book_id = db.Column(db.Integer, db.ForeignKey('books.id', ondelete='CASCADE'), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+
+    def __repr__(self):
+        return f'<BookSimilarity {self.book_id} #{self.rank}: {self.similar_book_id} ({self.score:.3f})>'
@@ -8,10 +8,25 @@ class BookClub(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     synopsis = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Bumped on any change to the club or its memberships; drives ETags
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     status = db.Column(db.String(20), default='Active')  # Add this
     current_book = db.Column(JSON)  # Storing current book as JSON (title, author, etc.)
+    # Maintained by Membership insert/delete events; `flask clubs reconcile-member-counts` repairs drift
+    member_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Bumped by ClubEvent.record and membership changes; orders the directory by recent activity
+    last_activity_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Indexes backing the keyset-paginated directory sorts and filters; pg_trgm
+    # GIN indexes on name and synopsis are created by migration on PostgreSQL
+    __table_args__ = (
+        db.Index('ix_bookclubs_created_at_id', 'created_at', 'id'),
+        db.Index('ix_bookclubs_member_count_id', 'member_count', 'id'),
+        db.Index('ix_bookclubs_last_activity_at_id', 'last_activity_at', 'id'),
+        db.Index('ix_bookclubs_status', 'status'),
+    )
 
     # Relationships
     owner = db.relationship('User', back_populates='owned_clubs')
@@ -19,6 +34,49 @@ class BookClub(db.Model):
     summaries = db.relationship('Summary', back_populates='bookclub', cascade='all, delete-orphan')
     meetings = db.relationship('Meeting', back_populates='bookclub', cascade='all, delete-orphan')
 
+    @classmethod
+    def touch(cls, club_id, connection=None):
+        """Mark a club as changed without loading it"""
+        stmt = cls.__table__.update().where(cls.id == club_id).values(updated_at=datetime.utcnow())
+        (connection or db.session).execute(stmt)
+
+    @classmethod
+    def adjust_member_count(cls, club_id, delta, connection=None):
+        """Atomically add delta to a club's member_count, marking it changed and active"""
+        now = datetime.utcnow()
+        stmt = cls.__table__.update().where(cls.id == club_id).values(
+            member_count=cls.member_count + delta,
+            updated_at=now,
+            last_activity_at=now
+        )
+        (connection or db.session).execute(stmt)
+
+    @classmethod
+    def record_activity(cls, club_id, connection=None):
+        """Bump last_activity_at without loading the club"""
+        stmt = cls.__table__.update().where(cls.id == club_id).values(last_activity_at=datetime.utcnow())
+        (connection or db.session).execute(stmt)
+
+    @classmethod
+    def reconcile_member_counts(cls):
+        """Recount memberships for every club whose stored count has drifted.
+
+        Returns the number of clubs corrected.
+        """
+        from .membership import Membership
+
+        actual = (
+            db.select(db.func.count(Membership.id))
+            .where(Membership.bookclub_id == cls.id)
+            .scalar_subquery()
+        )
+        result = db.session.execute(
+            cls.__table__.update()
+            .where(cls.member_count != actual)
+            .values(member_count=actual, updated_at=datetime.utcnow())
+        )
+        return result.rowcount
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -26,6 +84,7 @@ class BookClub(db.Model):
             'synopsis': self.synopsis,
             'created_at': self.created_at.isoformat(),
             'owner_id': self.owner_id,
-            'member_count': len(self.memberships),
+            'member_count': self.member_count,
+            'last_activity_at': self.last_activity_at.isoformat() if self.last_activity_at else None,
             'current_book': self.current_book  # Ensure that the current book is included
         }
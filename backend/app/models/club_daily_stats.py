@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class ClubDailyStats(db.Model):
+    """One day of a club's activity, rolled up by ``flask clubs refresh-stats``.
+
+    Counters are added to incrementally by app.services.club_stats; pages_read
+    is a snapshot of the members' total pages at the day's last refresh, so
+    reading velocity is the difference between consecutive snapshots.
+    """
+    __tablename__ = 'club_daily_stats'
+
+    bookclub_id = db.Column(db.Integer, db.ForeignKey('bookclubs.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    members_joined = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    members_left = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    summaries_posted = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    meetings_held = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pages_read = db.Column(db.Integer, nullable=True)  # None: no progress snapshot taken that day
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ClubDailyStats club={self.bookclub_id} {self.day}>'
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from app.extensions import db
+from .bookclub import BookClub
+
+
+class ClubEvent(db.Model):
+    """Append-only log of what happened in a club, read back as its activity feed"""
+    __tablename__ = 'club_events'
+
+    # Event types written by the route handlers
+    CLUB_CREATED = 'club_created'
+    CLUB_UPDATED = 'club_updated'
+    BOOK_CHANGED = 'book_changed'
+    MEMBER_JOINED = 'member_joined'
+    MEMBER_LEFT = 'member_left'
+    SUMMARY_POSTED = 'summary_posted'
+    MEETING_SCHEDULED = 'meeting_scheduled'
+    MEETING_UPDATED = 'meeting_updated'
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer(), 'sqlite'), primary_key=True)
+    bookclub_id = db.Column(db.Integer, db.ForeignKey('bookclubs.id', ondelete='CASCADE'), nullable=False)
+    event_type = db.Column(db.String(40), nullable=False)
+    actor_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    subject_id = db.Column(db.Integer, nullable=True)  # id of the summary, meeting, user... the event is about
+    payload = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # The feed is always one club read newest-first by id
+    __table_args__ = (
+        db.Index('ix_club_events_bookclub_id_id', 'bookclub_id', 'id'),
+    )
+
+    @classmethod
+    def record(cls, bookclub_id, event_type, actor_id=None, subject_id=None, payload=None):
+        """Add an event to the current transaction and mark the club as active"""
+        event = cls(
+            bookclub_id=bookclub_id,
+            event_type=event_type,
+            actor_id=actor_id,
+            subject_id=subject_id,
+            payload=payload
+        )
+        db.session.add(event)
+        BookClub.record_activity(bookclub_id)
+        return event
+
+    @classmethod
+    def record_many(cls, bookclub_id, event_type, subject_ids, actor_id=None, payload=None):
+        """Add one event per subject, marking the club active once rather than per event"""
+        events = [
+            cls(bookclub_id=bookclub_id, event_type=event_type, actor_id=actor_id,
+                subject_id=subject_id, payload=payload)
+            for subject_id in subject_ids
+        ]
+        db.session.add_all(events)
+        if events:
+            BookClub.record_activity(bookclub_id)
+        return events
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'bookclub_id': self.bookclub_id,
+            'type': self.event_type,
+            'actor_id': self.actor_id,
+            'subject_id': self.subject_id,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<ClubEvent {self.id} {self.event_type} club={self.bookclub_id}>'
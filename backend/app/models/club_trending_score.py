@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class ClubTrendingScore(db.Model):
+    """A club's exponentially decayed activity score, kept in log space.
+
+    log_score is log(sum of weight * exp(decay * (event time - epoch))) over
+    the club's events; see app.services.trending. Every score decays at the
+    same rate, so ordering by log_score ranks clubs at any moment without
+    rewriting rows as time passes.
+    """
+    __tablename__ = 'club_trending_scores'
+
+    bookclub_id = db.Column(db.Integer, db.ForeignKey('bookclubs.id', ondelete='CASCADE'), primary_key=True)
+    log_score = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # The top-N read is one backwards scan of this index
+    __table_args__ = (
+        db.Index('ix_club_trending_scores_log_score', 'log_score'),
+    )
+
+    def __repr__(self):
+        return f'<ClubTrendingScore club={self.bookclub_id} {self.log_score:.3f}>'
@@ -4,6 +4,6 @@ from datetime import datetime
 follows = db.Table('follows',
     db.Column('follower_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
     db.Column('followed_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
-    db.Column('created_at', db.DateTime, default=datetime.utcnow),
+    db.Column('created_at', db.DateTime, nullable=False, default=datetime.utcnow),
     extend_existing=True 
 )
\ No newline at end of file
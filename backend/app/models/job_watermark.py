@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class JobWatermark(db.Model):
+    """High-water mark of the last row an incremental batch job has consumed"""
+    __tablename__ = 'job_watermarks'
+
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def get(cls, name, default=0):
+        row = db.session.get(cls, name)
+        return row.value if row is not None else default
+
+    @classmethod
+    def set(cls, name, value):
+        row = db.session.get(cls, name)
+        if row is None:
+            db.session.add(cls(name=name, value=value))
+        else:
+            row.value = value
+
+    def __repr__(self):
+        return f'<JobWatermark {self.name}={self.value}>'
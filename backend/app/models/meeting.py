@@ -19,3 +19,4 @@ class Meeting(db.Model):
 
     def __repr__(self):
         return f"<Meeting bookclub_id={self.bookclub_id} meeting_date={self.meeting_date} agenda={self.agenda}>"
+
@@ -1,5 +1,8 @@
 from datetime import datetime
+from sqlalchemy import event
 from app.extensions import db  # ✅ CORRECT
+from app.utils import dialect_insert
+from .bookclub import BookClub
 
 class Membership(db.Model):
     __tablename__ = 'memberships'  # Fixed double underscores
@@ -12,6 +15,15 @@ class Membership(db.Model):
     role = db.Column(db.String(50), default='member', nullable=False)
     status = db.Column(db.String(20), default='active')  # Added status field
 
+    # Back the paginated roster (keyset on id) and its role filter / counts,
+    # and a user's clubs; a user belongs to a club at most once
+    __table_args__ = (
+        db.UniqueConstraint('bookclub_id', 'user_id', name='uq_memberships_bookclub_id_user_id'),
+        db.Index('ix_memberships_bookclub_id_id', 'bookclub_id', 'id'),
+        db.Index('ix_memberships_bookclub_id_role_id', 'bookclub_id', 'role', 'id'),
+        db.Index('ix_memberships_user_id', 'user_id'),
+    )
+
     # Relationships
     bookclub = db.relationship('BookClub', back_populates='memberships')
     user = db.relationship('User', back_populates='memberships')
@@ -25,6 +37,47 @@ class Membership(db.Model):
     def _repr_(self):
         return f"<Membership {self.id}: User {self.user_id} in Club {self.bookclub_id} as {self.role}>"
 
+    @classmethod
+    def add_many(cls, bookclub_id, user_ids, role='member'):
+        """Insert memberships for user_ids in one statement, skipping existing members.
+
+        Core inserts bypass the mapper events, so member_count is adjusted here.
+        Returns the ids of the users actually added.
+        """
+        if not user_ids:
+            return []
+        table = cls.__table__
+        now = datetime.utcnow()
+        stmt = (
+            dialect_insert(table)
+            .on_conflict_do_nothing(index_elements=[table.c.bookclub_id, table.c.user_id])
+            .returning(table.c.user_id)
+        )
+        added = db.session.scalars(stmt, [
+            {'bookclub_id': bookclub_id, 'user_id': user_id, 'role': role, 'status': 'active',
+             'is_admin': False, 'joined_at': now}
+            for user_id in user_ids
+        ]).all()
+        if added:
+            BookClub.adjust_member_count(bookclub_id, len(added))
+        return added
+
+    @classmethod
+    def remove_many(cls, bookclub_id, user_ids):
+        """Delete the memberships of user_ids in one statement; returns the ids removed"""
+        if not user_ids:
+            return []
+        table = cls.__table__
+        stmt = (
+            table.delete()
+            .where(table.c.bookclub_id == bookclub_id, table.c.user_id.in_(user_ids))
+            .returning(table.c.user_id)
+        )
+        removed = db.session.scalars(stmt).all()
+        if removed:
+            BookClub.adjust_member_count(bookclub_id, -len(removed))
+        return removed
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -36,3 +89,19 @@ class Membership(db.Model):
             'user': self.user.to_dict() if self.user else None,
             'bookclub': self.bookclub.to_dict() if self.bookclub else None
         }
+
+
+@event.listens_for(Membership, 'after_insert')
+def _count_new_member(mapper, connection, membership):
+    BookClub.adjust_member_count(membership.bookclub_id, 1, connection)
+
+
+@event.listens_for(Membership, 'after_delete')
+def _count_removed_member(mapper, connection, membership):
+    BookClub.adjust_member_count(membership.bookclub_id, -1, connection)
+
+
+@event.listens_for(Membership, 'after_update')
+def _touch_bookclub(mapper, connection, membership):
+    # Club responses embed per-role member counts, so role changes change the club
+    BookClub.touch(membership.bookclub_id, connection)
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class ReadingProgress(db.Model):
+    """Latest reading position of one member in a club's current book.
+
+    Written in batches by app.services.progress.ProgressBuffer rather than
+    per request.
+    """
+    __tablename__ = 'reading_progress'
+
+    bookclub_id = db.Column(db.Integer, db.ForeignKey('bookclubs.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    pages_read = db.Column(db.Integer, nullable=True)
+    percent = db.Column(db.Float, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'bookclub_id': self.bookclub_id,
+            'user_id': self.user_id,
+            'pages_read': self.pages_read,
+            'percent': self.percent,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<ReadingProgress club={self.bookclub_id} user={self.user_id} {self.percent}%>'
@@ -17,5 +17,10 @@ class Review(db.Model):
    
     book = db.relationship('Book', back_populates='reviews')
 
+    # An author's recent reviews, read directly by the home feed
+    __table_args__ = (
+        db.Index('ix_reviews_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Review id={self.id} rating={self.rating}>"
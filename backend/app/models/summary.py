@@ -17,6 +17,11 @@ class Summary(db.Model):
     user = db.relationship('User', back_populates='summaries')  # Re-add this
     bookclub = db.relationship('BookClub', back_populates='summaries')
 
+    # An author's recent summaries, read directly by the home feed
+    __table_args__ = (
+        db.Index('ix_summaries_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+
     def __init__(self, content, user_id, bookclub_id=None):
         self.content = content
         self.user_id = user_id
@@ -34,3 +39,4 @@ class Summary(db.Model):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
+
@@ -0,0 +1,28 @@
+from app.extensions import db
+
+
+class TimelineEntry(db.Model):
+    """A followed author's summary or review, fanned out into one reader's home feed.
+
+    Written by app.services.timeline when the item is created; authors with
+    very many followers are read from their own tables instead.
+    """
+    __tablename__ = 'timeline_entries'
+
+    SUMMARY = 'summary'
+    REVIEW = 'review'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    item_type = db.Column(db.String(10), primary_key=True)
+    item_id = db.Column(db.Integer, primary_key=True)
+    author_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    # A reader's feed is one backwards range scan; deleting an item finds its copies
+    __table_args__ = (
+        db.Index('ix_timeline_entries_user_id_created_at', 'user_id', 'created_at', 'item_type', 'item_id'),
+        db.Index('ix_timeline_entries_item_type_item_id', 'item_type', 'item_id'),
+    )
+
+    def __repr__(self):
+        return f'<TimelineEntry user={self.user_id} {self.item_type} {self.item_id}>'
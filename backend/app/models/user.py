@@ -1,16 +1,25 @@
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.extensions import db
-from typing import Optional, Dict, Any, List
+from app.utils import encode_cursor, decode_cursor
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# session.info key under which follow changes wait for the transaction to commit
+FOLLOW_CHANGES_KEY = 'follow_changes'
+
 follows = db.Table(
     'follows',
     db.Column('follower_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
     db.Column('followed_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
-    db.Column('created_at', db.DateTime, default=datetime.utcnow)
+    db.Column('created_at', db.DateTime, nullable=False, default=datetime.utcnow),
+    # The primary key serves "whom do I follow"; this serves "who follows me"
+    db.Index('ix_follows_followed_id_follower_id', 'followed_id', 'follower_id'),
+    # Keyset pagination of each list, newest follow first
+    db.Index('ix_follows_followed_id_created_at_follower_id', 'followed_id', 'created_at', 'follower_id'),
+    db.Index('ix_follows_follower_id_created_at_followed_id', 'follower_id', 'created_at', 'followed_id')
 )
 
 class User(db.Model):
@@ -31,6 +40,10 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Counter caches over follows, kept by adjust_follow_counts
+    followers_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    following_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     # Relationships
     summaries = db.relationship('Summary', back_populates='user', cascade='all, delete-orphan')
     following = db.relationship(
@@ -90,6 +103,7 @@ class User(db.Model):
         if not self.is_following(user):
             self.following.append(user)
             self.updated_at = datetime.utcnow()
+            User.adjust_follow_counts(self.id, user.id, 1)
             db.session.commit()
             logger.info(f"User {self.id} started following {user.id}")
             return True
@@ -103,18 +117,77 @@ class User(db.Model):
         if self.is_following(user):
             self.following.remove(user)
             self.updated_at = datetime.utcnow()
+            User.adjust_follow_counts(self.id, user.id, -1)
             db.session.commit()
             logger.info(f"User {self.id} unfollowed {user.id}")
             return True
         return False
 
-    def get_followers(self, page: int = 1, per_page: int = 10) -> List['User']:
-        """Get paginated list of followers"""
-        return self.followers.paginate(page=page, per_page=per_page, error_out=False)
+    @classmethod
+    def adjust_follow_counts(cls, follower_id: int, followed_id: int, delta: int):
+        """Atomically add delta to the follower's following_count and the followed user's followers_count.
+
+        Every follow change goes through here, so the change is also noted in
+        the session for app.services.pubsub to publish once it commits.
+        """
+        stmt = cls.__table__.update().where(cls.id.in_([follower_id, followed_id])).values(
+            following_count=cls.following_count + db.case((cls.id == follower_id, delta), else_=0),
+            followers_count=cls.followers_count + db.case((cls.id == followed_id, delta), else_=0)
+        )
+        db.session.execute(stmt)
+        db.session.info.setdefault(FOLLOW_CHANGES_KEY, []).append((follower_id, followed_id, delta))
+
+    @classmethod
+    def reconcile_follow_counts(cls) -> int:
+        """Recount follows for every user whose stored counts have drifted.
+
+        Returns the number of users corrected.
+        """
+        followers = (
+            db.select(db.func.count()).select_from(follows)
+            .where(follows.c.followed_id == cls.id)
+            .scalar_subquery()
+        )
+        following = (
+            db.select(db.func.count()).select_from(follows)
+            .where(follows.c.follower_id == cls.id)
+            .scalar_subquery()
+        )
+        stmt = cls.__table__.update().where(
+            db.or_(cls.followers_count != followers, cls.following_count != following)
+        ).values(followers_count=followers, following_count=following)
+        return db.session.execute(stmt).rowcount
+
+    def follow_page(self, direction: str, limit: Optional[int], after: Optional[str] = None,
+                    offset: int = 0) -> Tuple[List[Tuple['User', datetime]], Optional[str]]:
+        """One page of this user's 'followers' or 'following', newest follow first.
+
+        Keyset on (follows.created_at, other user's id) after the cursor of the
+        previous page; offset only serves the legacy page-number API. Returns
+        the (user, followed_at) rows and the next page's cursor, if any.
+        Raises ValueError for a malformed cursor.
+        """
+        if direction == 'followers':
+            own, other = follows.c.followed_id, follows.c.follower_id
+        else:
+            own, other = follows.c.follower_id, follows.c.followed_id
+
+        query = db.select(User, follows.c.created_at).join(follows, other == User.id).where(own == self.id)
+        if after:
+            try:
+                created_at, other_id = decode_cursor(after)
+                key = (datetime.fromisoformat(created_at), int(other_id))
+            except (TypeError, ValueError):
+                raise ValueError('Invalid cursor')
+            query = query.where(db.tuple_(follows.c.created_at, other) < key)
+        query = query.order_by(follows.c.created_at.desc(), other.desc())
+        if limit is None:
+            return db.session.execute(query).all(), None
 
-    def get_following(self, page: int = 1, per_page: int = 10) -> List['User']:
-        """Get paginated list of users being followed"""
-        return self.following.paginate(page=page, per_page=per_page, error_out=False)
+        rows = db.session.execute(query.offset(offset).limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1][1], rows[-1][0].id) if has_more else None
 
     # Serialization
     def to_dict(self, include_relationships: bool = False) -> Dict[str, Any]:
@@ -134,8 +207,8 @@ class User(db.Model):
         
         if include_relationships:
             base_data.update({
-                'following_count': self.following.count(),
-                'followers_count': self.followers.count(),
+                'following_count': self.following_count,
+                'followers_count': self.followers_count,
                 'owned_clubs_count': len(self.owned_clubs),
                 'summaries_count': len(self.summaries)
             })
@@ -150,8 +223,8 @@ class User(db.Model):
             'bio': self.bio,
             'avatar_url': self.avatar_url,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'following_count': self.following.count(),
-            'followers_count': self.followers.count()
+            'following_count': self.following_count,
+            'followers_count': self.followers_count
         }
 
     # Utility Methods
@@ -1,7 +1,8 @@
-from flask import Blueprint, request, jsonify 
+from flask import Blueprint, request, jsonify, current_app
 from ..models import User, BookClub, Summary, Membership
 from app.extensions import db  # ✅ CORRECT
 from ..middleware import token_required, admin_required
+from ..services import club_deletion
 from datetime import datetime
 from sqlalchemy import func
 
@@ -110,7 +111,7 @@ def get_all_bookclubs(current_user):
             'name': club.name,
             'description': club.description,
             'created_at': club.created_at.isoformat(),
-            'member_count': len(club.members),
+            'member_count': club.member_count,
             'book_count': len(club.books)
         })
     return jsonify(result), 200
@@ -138,4 +139,16 @@ def get_bookclub(current_user, club_id):
 @token_required
 @admin_required
 def delete_bookclub(current_user, club_id):
-    club = BookClub.query.get_or_
+    club = db.session.execute(
+        db.select(BookClub.id, BookClub.member_count).where(BookClub.id == club_id)
+    ).first()
+    if not club:
+        return jsonify({'error': 'Book club not found'}), 404
+
+    if club.member_count >= current_app.config.get('CLUB_DELETE_BACKGROUND_THRESHOLD', 5000):
+        club_deletion.start_background_delete(current_app._get_current_object(), club_id)
+        return jsonify({'message': 'Book club deletion started'}), 202
+
+    club_deletion.delete_club(club_id)
+    db.session.commit()
+    return jsonify({'message': 'Book club deleted successfully'}), 200
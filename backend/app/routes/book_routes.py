@@ -1,58 +1,413 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app, redirect, send_file, url_for
 from datetime import datetime
 from app.extensions import db  # ✅ CORRECT
 from app.models.book import Book
+from app.models.book_genre import BookGenre
+from app.models.book_similarity import BookSimilarity
+from app.services.cache import TTLCache
+from app.services.book_export import CONTENT_TYPES, export_statement, stream_catalog
+from app.services.book_import import import_books, iter_csv, iter_ndjson
+from app.services.covers import SIZES as COVER_SIZES, get_cover_cache, sniff_mimetype
+from app.services.dedupe import DEFAULT_THRESHOLD, find_duplicate_pairs, find_similar
+from app.services.recommendations import TOP_K
+from app.services.search import search_books
+from app.middleware import token_required, admin_required
+from app.utils import encode_cursor, decode_cursor, parse_limit, resource_etag, not_modified, add_validators
+from sqlalchemy import tuple_, literal, union_all
 
 book_bp = Blueprint('books', __name__, url_prefix='/books')
 
+# Facet counts change slowly and are expensive to aggregate on every hit
+facets_cache = TTLCache(ttl=60)
+# Neighbour lists only change when the offline build-similar job runs
+similar_cache = TTLCache(ttl=300, maxsize=4096)
+
+# ---------- Helper Functions ----------
+
+def _number_arg(args, name, cast):
+    """Read an optional numeric query argument, raising ValueError if malformed"""
+    value = args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+
+def apply_book_filters(query, args):
+    """Push the catalog filters from the query string down into SQL"""
+    author = args.get('author')
+    if author:
+        query = query.filter(db.func.lower(Book.author) == author.strip().lower())
+    language = args.get('language')
+    if language:
+        query = query.filter(Book.language == language)
+    genre = args.get('genre')
+    if genre:
+        query = query.filter(Book.genre_links.any(BookGenre.genre == genre))
+
+    min_pages = _number_arg(args, 'min_pages', int)
+    max_pages = _number_arg(args, 'max_pages', int)
+    min_rating = _number_arg(args, 'min_rating', float)
+    max_rating = _number_arg(args, 'max_rating', float)
+    if min_pages is not None:
+        query = query.filter(Book.pages >= min_pages)
+    if max_pages is not None:
+        query = query.filter(Book.pages <= max_pages)
+    if min_rating is not None:
+        query = query.filter(Book.rating >= min_rating)
+    if max_rating is not None:
+        query = query.filter(Book.rating <= max_rating)
+    return query
+
 # GET all books
 @book_bp.route('/', methods=['GET'])
 def get_books():
+    """List books, optionally filtered; paginated when `limit` or `after` is given.
+
+    Pages are ordered newest first on (date_added, id) and walked with the
+    opaque `next_cursor` returned by the previous page.
+    """
     try:
-        books = Book.query.all()
-        return jsonify([book.to_dict() for book in books]), 200
+        query = apply_book_filters(Book.query, request.args)
+
+        if 'limit' not in request.args and 'after' not in request.args:
+            books = query.all()
+            return jsonify([book.to_dict() for book in books]), 200
+
+        limit = parse_limit(request.args.get('limit'))
+        after = request.args.get('after')
+        if after:
+            added, book_id = decode_cursor(after)
+            query = query.filter(
+                tuple_(Book.date_added, Book.id) < (datetime.fromisoformat(added), int(book_id))
+            )
+
+        books = query.order_by(Book.date_added.desc(), Book.id.desc()).limit(limit + 1).all()
+        has_more = len(books) > limit
+        books = books[:limit]
+
+        return jsonify({
+            'books': [book.to_dict() for book in books],
+            'next_cursor': encode_cursor(books[-1].date_added, books[-1].id) if has_more else None,
+            'limit': limit
+        }), 200
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": "Invalid query parameters", "details": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to fetch books", "details": str(e)}), 500
 
+# GET ranked full-text search
+@book_bp.route('/search', methods=['GET'])
+def search():
+    """Search titles, authors and synopses; hits are ranked and paginated"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Missing required parameter: q"}), 400
+
+    try:
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = parse_limit(request.args.get('per_page'))
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "details": str(e)}), 400
+
+    try:
+        hits = search_books(query, offset=(page - 1) * per_page, limit=per_page + 1)
+        has_more = len(hits) > per_page
+        hits = hits[:per_page]
+
+        books = {book.id: book for book in Book.query.filter(Book.id.in_([h[0] for h in hits])).all()}
+        results = [{
+            'book': books[book_id].to_dict(),
+            'rank': rank,
+            'snippet': snippet
+        } for book_id, rank, snippet in hits if book_id in books]
+
+        return jsonify({
+            'results': results,
+            'page': page,
+            'per_page': per_page,
+            'has_more': has_more
+        }), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to search books", "details": str(e)}), 500
+
+# GET genre and language facet counts
+@book_bp.route('/facets', methods=['GET'])
+def get_facets():
+    """Per-genre and per-language book counts from a single aggregate query"""
+    try:
+        facets = facets_cache.get_or_set('all', _compute_facets)
+        response = jsonify(facets)
+        response.cache_control.public = True
+        response.cache_control.max_age = int(facets_cache.ttl)
+        return response, 200
+    except Exception as e:
+        return jsonify({"error": "Failed to fetch facets", "details": str(e)}), 500
+
+def _compute_facets():
+    genre_counts = db.select(
+        literal('genre').label('facet'),
+        BookGenre.genre.label('value'),
+        db.func.count().label('count')
+    ).group_by(BookGenre.genre)
+    language_counts = db.select(
+        literal('language').label('facet'),
+        Book.language.label('value'),
+        db.func.count().label('count')
+    ).where(Book.language.isnot(None)).group_by(Book.language)
+
+    facets = {'genres': [], 'languages': []}
+    for row in db.session.execute(union_all(genre_counts, language_counts)):
+        key = 'genres' if row.facet == 'genre' else 'languages'
+        facets[key].append({'value': row.value, 'count': row.count})
+    for values in facets.values():
+        values.sort(key=lambda item: (-item['count'], item['value']))
+    return facets
+
+# GET streaming catalog export
+@book_bp.route('/export', methods=['GET'])
+def export_books():
+    """Stream the (optionally filtered) catalog as CSV or NDJSON in constant memory"""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in CONTENT_TYPES:
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    try:
+        stmt = apply_book_filters(export_statement(), request.args)
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "details": str(e)}), 400
+
+    compress = (
+        request.args.get('gzip', '').lower() in ('1', 'true')
+        or request.accept_encodings['gzip'] > 0
+    )
+    response = Response(
+        stream_with_context(stream_catalog(fmt, stmt, compress=compress)),
+        content_type=CONTENT_TYPES[fmt]
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename=books.{fmt}'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+    return response
+
+# GET likely duplicate pairs (admin)
+@book_bp.route('/duplicates', methods=['GET'])
+@token_required
+@admin_required
+def get_duplicates(current_user):
+    """Pairs of books with near-identical normalized title and author"""
+    try:
+        threshold = float(request.args.get('threshold', DEFAULT_THRESHOLD))
+        if not 0 < threshold <= 1:
+            raise ValueError('threshold must be between 0 and 1')
+        limit = parse_limit(request.args.get('limit'), default=50, maximum=500)
+        after = tuple(int(v) for v in decode_cursor(request.args['after'])) if request.args.get('after') else (0, 0)
+        if len(after) != 2:
+            raise ValueError('Invalid cursor')
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "details": str(e)}), 400
+
+    try:
+        pairs = find_duplicate_pairs(threshold=threshold, limit=limit, after=after)
+        ids = {book_id for pair in pairs for book_id in pair[:2]}
+        books = {
+            row.id: {'id': row.id, 'title': row.title, 'author': row.author}
+            for row in db.session.execute(
+                db.select(Book.id, Book.title, Book.author).where(Book.id.in_(ids))
+            )
+        }
+        return jsonify({
+            'duplicates': [{
+                'book': books.get(book_id),
+                'duplicate': books.get(other_id),
+                'similarity': round(score, 3)
+            } for book_id, other_id, score in pairs],
+            'next_cursor': encode_cursor(*pairs[-1][:2]) if len(pairs) == limit else None
+        }), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to find duplicates", "details": str(e)}), 500
+
 # GET single book by ID
 @book_bp.route('/<int:id>', methods=['GET'])
 def get_book(id):
     try:
+        # Answer revalidation from a two-column lookup before loading the book
+        version = Book.version_of(id)
+        if version is None:
+            return jsonify({"error": "Book not found"}), 404
+        etag = resource_etag('book', id, version)
+        if (response := not_modified(etag, version)) is not None:
+            return response
+
         book = Book.query.get(id)
-        if book:
-            return jsonify(book.to_dict()), 200
-        return jsonify({"error": "Book not found"}), 404
+        if not book:
+            return jsonify({"error": "Book not found"}), 404
+        version = book.version
+        return add_validators(jsonify(book.to_dict()), resource_etag('book', id, version), version), 200
     except Exception as e:
         return jsonify({"error": "Failed to fetch book", "details": str(e)}), 500
 
+# GET "readers also liked" recommendations
+@book_bp.route('/<int:id>/similar', methods=['GET'])
+def get_similar_books(id):
+    try:
+        limit = parse_limit(request.args.get('limit'), default=10, maximum=TOP_K)
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "details": str(e)}), 400
+
+    try:
+        similar = similar_cache.get_or_set((id, limit), lambda: _load_similar(id, limit))
+        if similar is None:
+            return jsonify({"error": "Book not found"}), 404
+        response = jsonify({'book_id': id, 'similar': similar})
+        response.cache_control.public = True
+        response.cache_control.max_age = int(similar_cache.ttl)
+        return response, 200
+    except Exception as e:
+        return jsonify({"error": "Failed to fetch similar books", "details": str(e)}), 500
+
+def _load_similar(book_id, limit):
+    rows = db.session.execute(
+        db.select(Book.id, Book.title, Book.author, Book.cover_image_url, BookSimilarity.score)
+        .join(Book, Book.id == BookSimilarity.similar_book_id)
+        .where(BookSimilarity.book_id == book_id)
+        .order_by(BookSimilarity.rank)
+        .limit(limit)
+    ).all()
+    if not rows and db.session.get(Book, book_id) is None:
+        return None
+    return [{
+        'book': {
+            'id': row.id,
+            'title': row.title,
+            'author': row.author,
+            'cover_image_url': row.cover_image_url
+        },
+        'score': round(row.score, 4)
+    } for row in rows]
+
+# GET resized cover thumbnail
+@book_bp.route('/<int:id>/cover', methods=['GET'])
+def get_cover(id):
+    """Redirect to the immutable thumbnail URL, or to the original while it is built"""
+    size = request.args.get('size', 'm')
+    if size not in COVER_SIZES:
+        return jsonify({"error": f"size must be one of: {', '.join(COVER_SIZES)}"}), 400
+
+    row = db.session.query(Book.cover_image_url).filter(Book.id == id).first()
+    if row is None:
+        return jsonify({"error": "Book not found"}), 404
+    if not row.cover_image_url:
+        return jsonify({"error": "Book has no cover image"}), 404
+    try:
+        Book.validate_cover_url(row.cover_image_url)
+    except ValueError:
+        # Stored before cover URLs were validated; never fetch or redirect to it
+        return jsonify({"error": "Book has no cover image"}), 404
+
+    cache = get_cover_cache(current_app._get_current_object())
+    digest = cache.lookup(row.cover_image_url, size)
+    if digest is None:
+        # Never block on the fetch: build in the background, serve the original meanwhile
+        cache.schedule(row.cover_image_url, size)
+        response = redirect(row.cover_image_url)
+        response.cache_control.no_store = True
+        return response
+
+    response = redirect(url_for('books.get_cover_thumbnail', digest=digest))
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
+
+# GET content-addressed thumbnail
+@book_bp.route('/covers/<digest>', methods=['GET'])
+def get_cover_thumbnail(digest):
+    """Serve a cached thumbnail; its URL names its content, so it never changes"""
+    path = get_cover_cache(current_app._get_current_object()).blob_path(digest)
+    if path is None:
+        return jsonify({"error": "Thumbnail not found"}), 404
+
+    with open(path, 'rb') as f:
+        mimetype = sniff_mimetype(f.read(12))
+    response = send_file(path, mimetype=mimetype, etag=digest, max_age=31536000, conditional=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 # POST create a new book
 @book_bp.route('/', methods=['POST'])
 def create_book():
     data = request.get_json()
     try:
-        required_fields = ['title', 'author']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-
-        new_book = Book(
-            title=data['title'],
-            author=data['author'],
-            genres=data.get('genres', []),
-            synopsis=data.get('synopsis'),
-            rating=data.get('rating'),
-            language=data.get('language'),
-            pages=data.get('pages'),
-            date_published=datetime.strptime(data['date_published'], "%Y-%m-%d") if data.get('date_published') else None,
-            cover_image_url=data.get('cover_image_url'),
-            date_added=datetime.strptime(data['date_added'], "%Y-%m-%d") if data.get('date_added') else datetime.utcnow()
-        )
+        fields = Book.parse_payload(data)
+
+        # Refuse duplicates unless the client confirms with ?force=true. Only a
+        # match on the full title blocks; books sharing just the main title, such
+        # as later volumes of a series, are created and the matches returned as a warning
+        possible_duplicates = []
+        if request.args.get('force', '').lower() not in ('1', 'true'):
+            threshold = current_app.config.get('BOOK_DUPLICATE_THRESHOLD', DEFAULT_THRESHOLD)
+            matches = find_similar(fields['title'], fields['author'], threshold=threshold)
+            if matches:
+                books = {b.id: b for b in Book.query.filter(Book.id.in_([m[0] for m in matches]))}
+                full_title = Book.full_title_key(fields['title'])
+                blocking, possible_duplicates = [], []
+                for book_id, score in matches:
+                    if book_id not in books:
+                        continue
+                    match = {**books[book_id].to_dict(), "similarity": round(score, 3)}
+                    if Book.full_title_key(books[book_id].title) == full_title:
+                        blocking.append(match)
+                    else:
+                        possible_duplicates.append(match)
+                if blocking:
+                    return jsonify({
+                        "error": "Possible duplicate book",
+                        "duplicates": blocking + possible_duplicates
+                    }), 409
+
+        new_book = Book(**fields)
         db.session.add(new_book)
         db.session.commit()
-        return jsonify(new_book.to_dict()), 201
+        facets_cache.invalidate()
+        body = new_book.to_dict()
+        if possible_duplicates:
+            body["possible_duplicates"] = possible_duplicates
+        return jsonify(body), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to create book", "details": str(e)}), 500
 
+# POST bulk import (streamed NDJSON or CSV)
+BULK_IMPORT_FORMATS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson'
+}
+
+@book_bp.route('/bulk', methods=['POST'])
+def bulk_import_books():
+    """Upsert books on (title, author) from a streamed NDJSON or CSV body"""
+    fmt = request.args.get('format') or BULK_IMPORT_FORMATS.get(request.mimetype)
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({
+            "error": "Unsupported import format",
+            "details": "Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson"
+        }), 415
+
+    try:
+        parse = iter_csv if fmt == 'csv' else iter_ndjson
+        result = import_books(parse(request.stream))
+        facets_cache.invalidate()
+        return jsonify(result), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to import books", "details": str(e)}), 500
+
 # PUT update book
 @book_bp.route('/<int:id>', methods=['PUT'])
 def update_book(id):
@@ -69,14 +424,21 @@ def update_book(id):
         book.rating = data.get('rating', book.rating)
         book.language = data.get('language', book.language)
         book.pages = data.get('pages', book.pages)
-        book.cover_image_url = data.get('cover_image_url', book.cover_image_url)
+        if data.get('cover_image_url'):
+            book.cover_image_url = Book.validate_cover_url(data['cover_image_url'])
+        elif 'cover_image_url' in data:
+            book.cover_image_url = None
         if data.get('date_published'):
             book.date_published = datetime.strptime(data['date_published'], "%Y-%m-%d")
         if data.get('date_added'):
             book.date_added = datetime.strptime(data['date_added'], "%Y-%m-%d")
 
         db.session.commit()
+        facets_cache.invalidate()
         return jsonify(book.to_dict()), 200
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to update book", "details": str(e)}), 500
 
@@ -90,6 +452,7 @@ def delete_book(id):
 
         db.session.delete(book)
         db.session.commit()
+        facets_cache.invalidate()
         return jsonify({"message": "Book deleted"}), 200
     except Exception as e:
         return jsonify({"error": "Failed to delete book", "details": str(e)}), 500
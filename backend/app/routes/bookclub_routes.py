@@ -1,14 +1,40 @@
-from flask import Blueprint, request, jsonify, current_app
-from datetime import datetime
+import json
+from flask import Blueprint, Response, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime, timedelta
 from app.models.bookclub import BookClub
 from app.models.membership import Membership
+from app.models.club_event import ClubEvent
+from app.models.reading_progress import ReadingProgress
 from app.models.book import Book
 from app.models.user import User
 from app.extensions import db
+from app.services import club_deletion, club_stats, trending
+from app.services.cache import TTLCache
+from app.services.progress import get_progress_buffer
+from app.services.pubsub import hub
+from app.utils import (
+    resource_etag, not_modified, add_validators,
+    encode_cursor, decode_cursor, parse_limit, contains_pattern
+)
+from sqlalchemy import or_, tuple_
 from sqlalchemy.orm import joinedload
 
 bookclub_bp = Blueprint('bookclub', __name__)
 
+# Progress pings check membership on every call; memberships rarely change
+membership_cache = TTLCache(ttl=60, maxsize=10000)
+progress_stats_cache = TTLCache(ttl=30)
+
+PROGRESS_PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+# Missed events a reconnecting stream may replay before being told to resync
+STREAM_REPLAY_LIMIT = 500
+
+# Window of the stats dashboard, in days
+CLUB_STATS_DEFAULT_DAYS = 90
+CLUB_STATS_MAX_DAYS = 366
+
 # ---------- Helper Functions ----------
 
 def validate_required_fields(data, required_fields):
@@ -28,34 +54,133 @@ def get_or_404(model, instance_id, description="Resource"):
         return None
     return instance
 
+def apply_club_filters(query, args):
+    """Apply the directory's status and free-text filters"""
+    status = args.get('status')
+    if status:
+        query = query.filter(BookClub.status == status)
+    else:
+        # Clubs being deleted in the background stay hidden until they're gone
+        query = query.filter(or_(BookClub.status.is_(None), BookClub.status != club_deletion.DELETING_STATUS))
+
+    search = (args.get('q') or '').strip()
+    if search:
+        # Plain ILIKE so PostgreSQL can use the pg_trgm indexes on name and synopsis
+        pattern = contains_pattern(search)
+        query = query.filter(or_(
+            BookClub.name.ilike(pattern, escape='\\'),
+            BookClub.synopsis.ilike(pattern, escape='\\')
+        ))
+    return query
+
+# Directory sort keys; each is paired with id as a tie-breaker, newest/largest first
+CLUB_SORTS = {
+    'created_at': BookClub.created_at,
+    'member_count': BookClub.member_count,
+    'activity': BookClub.last_activity_at,
+}
+
+def serialize_club_summary(club):
+    return {
+        'id': club.id,
+        'name': club.name,
+        'synopsis': club.synopsis,
+        'created_at': club.created_at.isoformat() if club.created_at else None,
+        'owner_id': club.owner_id,
+        'member_count': club.member_count,
+        'last_activity_at': club.last_activity_at.isoformat() if club.last_activity_at else None,
+        'current_book': club.current_book,
+        'status': club.status
+    }
+
 # ---------- Book Club Routes ----------
 
 @bookclub_bp.route('/', methods=['GET'])
 def get_all_clubs():
-    """Get all book clubs with detailed information"""
+    """List book clubs, optionally filtered by `status` and searched with `q`.
+
+    Paginated when `limit` or `after` is given: `sort` is one of created_at
+    (default), member_count or activity, and pages are walked with the
+    opaque `next_cursor` returned by the previous page.
+    """
     try:
-        clubs = BookClub.query.options(
-            joinedload(BookClub.memberships),
-            joinedload(BookClub.owner)
-        ).all()
-        
-        clubs_data = [{
-            'id': club.id,
-            'name': club.name,
-            'synopsis': club.synopsis,
-            'created_at': club.created_at.isoformat() if club.created_at else None,
-            'owner_id': club.owner_id,
-            'member_count': len(club.memberships),
-            'current_book': club.current_book,
-            'status': club.status
-        } for club in clubs]
-        
-        return jsonify({'bookclubs': clubs_data}), 200
-        
+        sort = request.args.get('sort', 'created_at')
+        if sort not in CLUB_SORTS:
+            raise ValueError(f'sort must be one of: {", ".join(CLUB_SORTS)}')
+        sort_column = CLUB_SORTS[sort]
+        query = apply_club_filters(BookClub.query, request.args)
+
+        if 'limit' not in request.args and 'after' not in request.args:
+            if 'sort' in request.args:
+                query = query.order_by(sort_column.desc(), BookClub.id.desc())
+            return jsonify({'bookclubs': [serialize_club_summary(club) for club in query.all()]}), 200
+
+        limit = parse_limit(request.args.get('limit'))
+        after = request.args.get('after')
+        if after:
+            value, club_id = decode_cursor(after)
+            if sort != 'member_count':
+                value = datetime.fromisoformat(value)
+            query = query.filter(tuple_(sort_column, BookClub.id) < (value, int(club_id)))
+
+        clubs = query.order_by(sort_column.desc(), BookClub.id.desc()).limit(limit + 1).all()
+        has_more = len(clubs) > limit
+        clubs = clubs[:limit]
+
+        return jsonify({
+            'bookclubs': [serialize_club_summary(club) for club in clubs],
+            'next_cursor': encode_cursor(getattr(clubs[-1], sort_column.key), clubs[-1].id) if has_more else None,
+            'limit': limit
+        }), 200
+
+    except (ValueError, TypeError) as e:
+        return jsonify({'message': 'Invalid query parameters', 'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error fetching clubs: {str(e)}", exc_info=True)
         return jsonify({'message': 'Failed to fetch clubs'}), 500
 
+@bookclub_bp.route('/trending', methods=['GET'])
+def get_trending_clubs():
+    """Clubs ranked by recent joins, summaries and meetings, paged with `limit` and `offset`"""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        offset = int(request.args.get('offset', 0))
+        if offset < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({'message': 'Invalid query parameters'}), 400
+
+    try:
+        top = trending.top_clubs()
+        page = top[offset:offset + limit]
+        clubs = {
+            club.id: club for club in
+            BookClub.query.filter(BookClub.id.in_([club_id for club_id, _ in page]))
+        } if page else {}
+
+        decay = trending.decay_rate(current_app.config.get('TRENDING_HALF_LIFE_HOURS', 48))
+        now = datetime.utcnow()
+        response = jsonify({
+            'clubs': [
+                dict(serialize_club_summary(clubs[club_id]),
+                     trending_score=round(trending.current_score(log_score, decay, now), 4))
+                for club_id, log_score in page
+                if club_id in clubs and clubs[club_id].status != club_deletion.DELETING_STATUS
+            ],
+            'offset': offset,
+            'limit': limit,
+            'total': len(top),
+            'next_offset': offset + limit if offset + limit < len(top) else None
+        })
+        response.cache_control.public = True
+        response.cache_control.max_age = trending.TOP_N_TTL
+        return response, 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching trending clubs: {str(e)}", exc_info=True)
+        return jsonify({'message': 'Failed to fetch trending clubs'}), 500
+
+
 @bookclub_bp.route('/', methods=['POST'])
 def create_club():
     """Create a new book club"""
@@ -95,20 +220,31 @@ def create_club():
             joined_at=datetime.utcnow()
         )
         db.session.add(membership)
+        joined = {'admin': [membership.user_id]}
 
-        # Add other members if specified
+        # Add other members if specified, checking they exist in one query
         if 'members' in data and isinstance(data['members'], list):
+            roles = {}
             for member_data in data['members']:
                 if 'user_id' in member_data and member_data['user_id'] != data['owner_id']:
-                    user = User.query.get(member_data['user_id'])
-                    if user:  # Only add if user exists
-                        db.session.add(Membership(
-                            user_id=member_data['user_id'],
-                            bookclub_id=new_club.id,
-                            role=member_data.get('role', 'member'),
-                            joined_at=datetime.utcnow()
-                        ))
+                    roles.setdefault(member_data['user_id'], member_data.get('role', 'member'))
+            if roles:
+                existing = db.session.scalars(db.select(User.id).where(User.id.in_(list(roles))))
+                for user_id in existing:  # Only add users that exist
+                    db.session.add(Membership(
+                        user_id=user_id,
+                        bookclub_id=new_club.id,
+                        role=roles[user_id],
+                        joined_at=datetime.utcnow()
+                    ))
+                    joined.setdefault(roles[user_id], []).append(user_id)
 
+        ClubEvent.record(new_club.id, ClubEvent.CLUB_CREATED, actor_id=new_club.owner_id,
+                         payload={'name': new_club.name})
+        # Founding members join like anyone else, so trending and stats both count them
+        for role, user_ids in joined.items():
+            ClubEvent.record_many(new_club.id, ClubEvent.MEMBER_JOINED, user_ids,
+                                  actor_id=new_club.owner_id, payload={'role': role})
         db.session.commit()
         
         return jsonify({
@@ -135,14 +271,24 @@ def create_club():
 def get_club(club_id):
     """Get detailed information about a specific club"""
     try:
-        club = BookClub.query.options(
-            joinedload(BookClub.memberships).joinedload(Membership.user),
-            joinedload(BookClub.owner)
-        ).get(club_id)
-        
+        # Answer revalidation from the club's updated_at before loading anything else
+        version = db.session.scalar(db.select(BookClub.updated_at).where(BookClub.id == club_id))
+        if version is None:
+            return jsonify({'message': 'Book club not found'}), 404
+        if (response := not_modified(resource_etag('bookclub', club_id, version), version)) is not None:
+            return response
+
+        club = BookClub.query.options(joinedload(BookClub.owner)).get(club_id)
         if not club:
             return jsonify({'message': 'Book club not found'}), 404
 
+        # Counts only; the roster itself is paginated at /bookclubs/<id>/members
+        role_counts = dict(db.session.execute(
+            db.select(Membership.role, db.func.count())
+            .where(Membership.bookclub_id == club_id)
+            .group_by(Membership.role)
+        ).all())
+
         response_data = {
             'id': club.id,
             'name': club.name,
@@ -153,23 +299,153 @@ def get_club(club_id):
                 'id': club.owner.id,
                 'username': club.owner.username
             },
-            'members': [{
-                'user_id': m.user_id,
-                'username': m.user.username,
-                'role': m.role,
-                'joined_at': m.joined_at.isoformat() if m.joined_at else None
-            } for m in club.memberships],
             'current_book': club.current_book,
-            'member_count': len(club.memberships)
+            'member_count': club.member_count,
+            'role_counts': role_counts,
+            'last_activity_at': club.last_activity_at.isoformat()
         }
 
-        return jsonify(response_data), 200
+        etag = resource_etag('bookclub', club_id, club.updated_at)
+        return add_validators(jsonify(response_data), etag, club.updated_at), 200
 
     except Exception as e:
         current_app.logger.error(f"Error fetching club {club_id}: {str(e)}", exc_info=True)
         return jsonify({'message': 'Failed to fetch club'}), 500
 
 
+@bookclub_bp.route('/<int:club_id>/members', methods=['GET'])
+def get_club_members(club_id):
+    """Page through a club's roster in join order, optionally filtered by `role`"""
+    try:
+        limit = parse_limit(request.args.get('limit'), default=50, maximum=200)
+        after = request.args.get('after')
+        after_id = int(decode_cursor(after)[0]) if after else None
+    except (ValueError, TypeError, IndexError):
+        return jsonify({'message': 'Invalid query parameters'}), 400
+
+    try:
+        if db.session.scalar(db.select(BookClub.id).where(BookClub.id == club_id)) is None:
+            return jsonify({'message': 'Book club not found'}), 404
+
+        # Column projection: no Membership or User objects are hydrated
+        query = (
+            db.select(
+                Membership.id, Membership.user_id, Membership.role, Membership.status,
+                Membership.joined_at, User.username, User.avatar_url
+            )
+            .join(User, User.id == Membership.user_id)
+            .where(Membership.bookclub_id == club_id)
+        )
+        role = request.args.get('role')
+        if role:
+            query = query.where(Membership.role == role)
+        if after_id is not None:
+            query = query.where(Membership.id > after_id)
+
+        rows = db.session.execute(query.order_by(Membership.id).limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return jsonify({
+            'members': [{
+                'membership_id': row.id,
+                'user_id': row.user_id,
+                'username': row.username,
+                'avatar_url': row.avatar_url,
+                'role': row.role,
+                'status': row.status,
+                'joined_at': row.joined_at.isoformat() if row.joined_at else None
+            } for row in rows],
+            'next_cursor': encode_cursor(rows[-1].id) if has_more else None,
+            'limit': limit
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching members of club {club_id}: {str(e)}", exc_info=True)
+        return jsonify({'message': 'Failed to fetch club members'}), 500
+
+
+@bookclub_bp.route('/<int:club_id>/feed', methods=['GET'])
+def get_club_feed(club_id):
+    """Page through a club's activity newest first, optionally filtered by `type`"""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        after = request.args.get('after')
+        before_id = int(decode_cursor(after)[0]) if after else None
+    except (ValueError, TypeError, IndexError):
+        return jsonify({'message': 'Invalid query parameters'}), 400
+
+    try:
+        if db.session.scalar(db.select(BookClub.id).where(BookClub.id == club_id)) is None:
+            return jsonify({'message': 'Book club not found'}), 404
+
+        # One range scan of ix_club_events_bookclub_id_id
+        query = (
+            db.select(ClubEvent, User.username)
+            .outerjoin(User, User.id == ClubEvent.actor_id)
+            .where(ClubEvent.bookclub_id == club_id)
+        )
+        event_type = request.args.get('type')
+        if event_type:
+            query = query.where(ClubEvent.event_type == event_type)
+        if before_id is not None:
+            query = query.where(ClubEvent.id < before_id)
+
+        rows = db.session.execute(query.order_by(ClubEvent.id.desc()).limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return jsonify({
+            'events': [dict(event.to_dict(), actor_username=username) for event, username in rows],
+            'next_cursor': encode_cursor(rows[-1][0].id) if has_more else None,
+            'limit': limit
+        }), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching feed of club {club_id}: {str(e)}", exc_info=True)
+        return jsonify({'message': 'Failed to fetch club feed'}), 500
+
+
+@bookclub_bp.route('/<int:club_id>/stats', methods=['GET'])
+def get_club_stats(club_id):
+    """Daily and weekly activity for the last `days` days, from the club_daily_stats rollup"""
+    try:
+        days = int(request.args.get('days', CLUB_STATS_DEFAULT_DAYS))
+        if not 1 <= days <= CLUB_STATS_MAX_DAYS:
+            raise ValueError
+    except ValueError:
+        return jsonify({'message': f'days must be between 1 and {CLUB_STATS_MAX_DAYS}'}), 400
+
+    try:
+        if db.session.scalar(db.select(BookClub.id).where(BookClub.id == club_id)) is None:
+            return jsonify({'message': 'Book club not found'}), 404
+
+        # The rollup only changes when the refresh job runs, so that run is the version
+        refreshed_at = club_stats.last_refreshed()
+        max_age = current_app.config.get('CLUB_STATS_MAX_AGE', 300)
+        etag = resource_etag(f'club-stats-{days}', club_id, refreshed_at) if refreshed_at else None
+        if etag and (response := not_modified(etag, refreshed_at, max_age)) is not None:
+            return response
+
+        end = (refreshed_at or datetime.utcnow()).date()
+        start = end - timedelta(days=days - 1)
+        response_data = dict(
+            club_stats.club_stats(club_id, start, end),
+            bookclub_id=club_id,
+            start=start.isoformat(),
+            end=end.isoformat(),
+            refreshed_at=refreshed_at.isoformat() if refreshed_at else None
+        )
+        response = jsonify(response_data)
+        if etag:
+            add_validators(response, etag, refreshed_at, max_age)
+        return response, 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error fetching stats of club {club_id}: {str(e)}", exc_info=True)
+        return jsonify({'message': 'Failed to fetch club stats'}), 500
+
+
 @bookclub_bp.route('/<int:club_id>', methods=['PUT'])
 def update_club(club_id):
     """Update book club details"""
@@ -182,6 +458,9 @@ def update_club(club_id):
         return jsonify({'message': 'No update data provided'}), 400
 
     try:
+        previous_book = club.current_book or {}
+        changed = [field for field in ('name', 'synopsis', 'status', 'owner_id') if field in data]
+
         if 'name' in data:
             club.name = data['name']
         if 'synopsis' in data:
@@ -205,7 +484,14 @@ def update_club(club_id):
                 'pagesRead': book_data.get('pagesRead', 0),
                 'progress': book_data.get('progress', 0)
             }
+            if (book_data.get('title'), book_data.get('author')) != (previous_book.get('title'), previous_book.get('author')):
+                ClubEvent.record(club.id, ClubEvent.BOOK_CHANGED, payload={
+                    'title': book_data.get('title'),
+                    'author': book_data.get('author')
+                })
 
+        if changed:
+            ClubEvent.record(club.id, ClubEvent.CLUB_UPDATED, payload={'fields': changed})
         club.updated_at = datetime.utcnow()
         db.session.commit()
 
@@ -226,18 +512,33 @@ def update_club(club_id):
 
 @bookclub_bp.route('/<int:club_id>', methods=['DELETE'])
 def delete_club(club_id):
-    """Delete a book club and its associations"""
-    club = get_or_404(BookClub, club_id, 'Book Club')
+    """Delete a book club and its associations.
+
+    Runs as one set-based DELETE per child table in a single transaction.
+    Large clubs (or ?background=true) are instead deleted in chunks by a
+    background job, answering 202 straight away.
+    """
+    club = db.session.execute(
+        db.select(BookClub.id, BookClub.member_count).where(BookClub.id == club_id)
+    ).first()
     if not club:
         return jsonify({'message': 'Book club not found'}), 404
 
+    background = (
+        request.args.get('background', '').lower() == 'true'
+        or club.member_count >= current_app.config.get('CLUB_DELETE_BACKGROUND_THRESHOLD', 5000)
+    )
     try:
-        # Delete associated memberships
-        Membership.query.filter_by(bookclub_id=club_id).delete()
-        db.session.delete(club)
-        db.session.commit()
+        if background:
+            club_deletion.start_background_delete(current_app._get_current_object(), club_id)
+            return jsonify({
+                'message': 'Club deletion started',
+                'status': club_deletion.DELETING_STATUS
+            }), 202
 
-        return jsonify({'message': 'Club deleted successfully'}), 200
+        removed = club_deletion.delete_club(club_id)
+        db.session.commit()
+        return jsonify({'message': 'Club deleted successfully', 'deleted': removed}), 200
 
     except Exception as e:
         db.session.rollback()
@@ -247,3 +548,177 @@ def delete_club(club_id):
             'error': str(e) if current_app.config['DEBUG'] else None
         }), 500
 
+
+# ---------- Reading Progress Routes ----------
+
+def is_member(club_id, user_id):
+    return membership_cache.get_or_set((club_id, user_id), lambda: db.session.scalar(
+        db.select(Membership.id).where(Membership.bookclub_id == club_id, Membership.user_id == user_id).limit(1)
+    ) is not None)
+
+@bookclub_bp.route('/<int:club_id>/progress', methods=['PATCH'])
+@jwt_required()
+def update_progress(club_id):
+    """Record the caller's progress in the club's current book.
+
+    Accepted into a write-behind buffer and persisted within a few seconds.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        pages_read = data.get('pages_read')
+        percent = data.get('progress')
+        if pages_read is None and percent is None:
+            raise ValueError('Provide pages_read and/or progress')
+        if pages_read is not None:
+            if isinstance(pages_read, bool) or int(pages_read) != pages_read or pages_read < 0:
+                raise ValueError('pages_read must be a non-negative integer')
+            pages_read = int(pages_read)
+        if percent is not None:
+            percent = float(percent)
+            if not 0 <= percent <= 100:
+                raise ValueError('progress must be between 0 and 100')
+    except (ValueError, TypeError) as e:
+        return jsonify({'message': 'Invalid progress', 'error': str(e)}), 400
+
+    user_id = int(get_jwt_identity())
+    if not is_member(club_id, user_id):
+        return jsonify({'message': 'Only club members can report progress'}), 403
+
+    get_progress_buffer(current_app._get_current_object()).record(club_id, user_id, pages_read, percent)
+    return jsonify({'message': 'Progress accepted'}), 202
+
+@bookclub_bp.route('/<int:club_id>/progress', methods=['GET'])
+def get_progress(club_id):
+    """Aggregate reading progress of the club's current members"""
+    try:
+        stats = progress_stats_cache.get_or_set(club_id, lambda: compute_progress_stats(club_id))
+        if stats is None:
+            return jsonify({'message': 'Book club not found'}), 404
+        response = jsonify(stats)
+        response.cache_control.max_age = int(progress_stats_cache.ttl)
+        return response, 200
+    except Exception as e:
+        current_app.logger.error(f"Error fetching progress for club {club_id}: {str(e)}", exc_info=True)
+        return jsonify({'message': 'Failed to fetch progress'}), 500
+
+def compute_progress_stats(club_id):
+    if db.session.scalar(db.select(BookClub.id).where(BookClub.id == club_id)) is None:
+        return None
+
+    # Members who left keep their row but no longer count
+    current = (
+        db.select(ReadingProgress.percent, ReadingProgress.pages_read)
+        .join(Membership, (Membership.bookclub_id == ReadingProgress.bookclub_id)
+              & (Membership.user_id == ReadingProgress.user_id))
+        .where(ReadingProgress.bookclub_id == club_id)
+        .subquery()
+    )
+    totals = db.session.execute(
+        db.select(db.func.count(), db.func.avg(current.c.percent), db.func.avg(current.c.pages_read))
+    ).one()
+
+    if db.engine.dialect.name == 'postgresql':
+        values = db.session.execute(db.select(*[
+            db.func.percentile_cont(q).within_group(current.c.percent) for q in PROGRESS_PERCENTILES
+        ])).one()
+        percentiles = dict(zip(PROGRESS_PERCENTILES, values))
+    else:
+        ordered = sorted(p for p in db.session.scalars(db.select(current.c.percent)) if p is not None)
+        percentiles = {q: _percentile(ordered, q) for q in PROGRESS_PERCENTILES}
+
+    return {
+        'bookclub_id': club_id,
+        'members_reporting': totals[0],
+        'average_progress': round(totals[1], 2) if totals[1] is not None else None,
+        'average_pages_read': round(totals[2], 1) if totals[2] is not None else None,
+        'percentiles': {
+            f'p{int(q * 100)}': round(value, 2) if value is not None else None
+            for q, value in percentiles.items()
+        }
+    }
+
+def _percentile(ordered, q):
+    """Linear-interpolated percentile, matching PostgreSQL's percentile_cont"""
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+# ---------- Live Stream Routes ----------
+
+def format_sse(message):
+    lines = []
+    if message.get('id') is not None:
+        lines.append(f"id: {message['id']}")
+    lines.append(f"event: {message['type']}")
+    lines.append(f"data: {json.dumps(message.get('data'), separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
+
+@bookclub_bp.route('/<int:club_id>/stream', methods=['GET'])
+def stream_club(club_id):
+    """Server-Sent Events stream of a club's activity and progress changes.
+
+    A reconnecting client's Last-Event-ID header (or `last_event_id` arg) is
+    used to replay the club_events it missed. Idle connections cost a
+    queue, not a thread, when served by gevent workers (see gunicorn.conf.py).
+    """
+    try:
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'message': 'Invalid Last-Event-ID'}), 400
+
+    if db.session.scalar(db.select(BookClub.id).where(BookClub.id == club_id)) is None:
+        return jsonify({'message': 'Book club not found'}), 404
+
+    # Subscribe before reading the backlog so nothing lands in between
+    subscription = hub.subscribe(club_id)
+    try:
+        missed = []
+        if last_event_id is not None:
+            missed = [{'id': e.id, 'type': e.event_type, 'data': e.to_dict()} for e in db.session.scalars(
+                db.select(ClubEvent)
+                .where(ClubEvent.bookclub_id == club_id, ClubEvent.id > last_event_id)
+                .order_by(ClubEvent.id)
+                .limit(STREAM_REPLAY_LIMIT + 1)
+            )]
+    except Exception:
+        subscription.close()
+        raise
+    finally:
+        # Don't hold a pooled connection for the life of the stream
+        db.session.remove()
+    heartbeat = current_app.config.get('SSE_HEARTBEAT_SECONDS', 15)
+
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            if len(missed) > STREAM_REPLAY_LIMIT:
+                # Too far behind: the client should reload the club and feed instead
+                yield format_sse({'type': 'resync', 'data': {'bookclub_id': club_id}})
+                return
+            for message in missed:
+                yield format_sse(message)
+            # Live messages can arrive out of id order (commit order, other workers),
+            # so only those the backlog already covered are skipped
+            replayed_up_to = missed[-1]['id'] if missed else 0
+
+            while not subscription.overflowed:
+                message = subscription.get(timeout=heartbeat)
+                if message is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                if message.get('id') is not None and message['id'] <= replayed_up_to:
+                    continue  # Already replayed from the backlog
+                yield format_sse(message)
+            # A subscriber that fell behind is dropped; the client reconnects and replays
+        finally:
+            subscription.close()
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Stop nginx buffering the stream
+    return response
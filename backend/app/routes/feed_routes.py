@@ -0,0 +1,32 @@
+from flask import Blueprint, request, jsonify
+from app.utils import parse_limit
+from app.services.timeline import feed_page
+from ..middleware import token_required
+import logging
+
+logger = logging.getLogger(__name__)
+feed_bp = Blueprint('feed', __name__)
+
+# --------------------------
+# Home timeline
+# --------------------------
+@feed_bp.route('/', methods=['GET'])
+@token_required
+def get_feed(current_user):
+    """Newest summaries and reviews by the users the current user follows"""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        items, next_cursor = feed_page(current_user.id, limit, after=request.args.get('after'))
+        return jsonify({
+            'items': items,
+            'next_cursor': next_cursor,
+            'limit': limit
+        }), 200
+    except ValueError as e:
+        return jsonify({'error': 'Invalid query parameters', 'details': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error fetching feed: {str(e)}")
+        return jsonify({
+            'error': 'Failed to fetch feed',
+            'details': str(e)
+        }), 500
@@ -1,12 +1,18 @@
-from flask import Blueprint, request, jsonify
-from app.models import User
+from flask import Blueprint, request, jsonify, current_app
+from app.models import User, follows
 from app.extensions import db
+from app.utils import follow_list_response
+from app.services.social_graph import get_social_graph, suggest_users
 from ..middleware import token_required
 import logging
 
 logger = logging.getLogger(__name__)
 following_bp = Blueprint('following', __name__, url_prefix='/api/following')
 
+# Upper bound on user ids per follow-status request
+MAX_STATUS_IDS = 500
+MAX_SUGGESTIONS = 50
+
 # --------------------------
 # Follow a user
 # --------------------------
@@ -14,14 +20,12 @@ following_bp = Blueprint('following', __name__, url_prefix='/api/following')
 @following_bp.route('/users/<int:user_id>/followers/id', methods=['GET'])
 def get_followers_count_by_id(user_id):
     user = User.query.get_or_404(user_id)
-    count = user.user.followers.count()
-    return jsonify({"count": count})
+    return jsonify({"count": user.followers_count})
 
 @following_bp.route('/users/<int:user_id>/following/id', methods=['GET'])
 def get_following_count_by_id(user_id):
     user = User.query.get_or_404(user_id)
-    count = user.following.count()
-    return jsonify({"count": count})
+    return jsonify({"count": user.following_count})
 
 
 @following_bp.route('/<int:user_id>', methods=['POST'])
@@ -51,8 +55,8 @@ def follow_user(current_user, user_id):
         return jsonify({
             'message': f'You are now following {user_to_follow.username}',
             'following': True,
-            'followers_count': user_to_follow.followers.count(),
-            'following_count': user_to_follow.following.count(),
+            'followers_count': user_to_follow.followers_count,
+            'following_count': user_to_follow.following_count,
             'user': user_to_follow.to_public_dict()
         }), 200
 
@@ -87,8 +91,8 @@ def unfollow_user(current_user, user_id):
             return jsonify({
                 'message': f'You have unfollowed {user_to_unfollow.username}',
                 'following': False,
-                'followers_count': user_to_unfollow.followers.count(),
-                'following_count': user_to_unfollow.following.count(),
+                'followers_count': user_to_unfollow.followers_count,
+                'following_count': user_to_unfollow.following_count,
                 'user': user_to_unfollow.to_public_dict()
             }), 200
 
@@ -111,8 +115,8 @@ def check_following(current_user, user_id):
         
         return jsonify({
             'is_following': current_user.is_following(target_user),
-            'followers_count': target_user.followers.count(),
-            'following_count': target_user.following.count(),
+            'followers_count': target_user.followers_count,
+            'following_count': target_user.following_count,
             'user': target_user.to_public_dict()
         }), 200
     except Exception as e:
@@ -123,68 +127,141 @@ def check_following(current_user, user_id):
         }), 500
 
 # --------------------------
-# Get user's followers
+# Check follow status for many users at once
 # --------------------------
-@following_bp.route('/<int:user_id>/followers', methods=['GET'])
-def get_user_followers(user_id):
+@following_bp.route('/status', methods=['POST'])
+@token_required
+def check_following_batch(current_user):
+    """Follow status in both directions between the current user and each of `user_ids`"""
+    user_ids = (request.get_json(silent=True) or {}).get('user_ids')
+    if (not isinstance(user_ids, list) or len(user_ids) > MAX_STATUS_IDS
+            or not all(isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids)):
+        return jsonify({
+            'error': f'user_ids must be a list of at most {MAX_STATUS_IDS} integers',
+            'code': 'INVALID_USER_IDS'
+        }), 400
+
     try:
-        user = User.query.get_or_404(user_id)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        minimal = request.args.get('minimal', 'false').lower() == 'true'
-
-        followers_paginated = user.get_followers(page=page, per_page=per_page)
-
-        if minimal:
-            followers_data = [{
-                'id': follower.id,
-                'username': follower.username,
-                'avatar_url': follower.avatar_url
-            } for follower in followers_paginated.items]
-        else:
-            followers_data = [follower.to_public_dict() for follower in followers_paginated.items]
+        statuses = {user_id: {'is_following': False, 'follows_you': False} for user_id in user_ids}
+        if user_ids:
+            # One query; the primary key and ix_follows_followed_id_follower_id each serve one side
+            rows = db.session.execute(
+                db.select(follows.c.follower_id, follows.c.followed_id).where(db.or_(
+                    db.and_(follows.c.follower_id == current_user.id, follows.c.followed_id.in_(user_ids)),
+                    db.and_(follows.c.followed_id == current_user.id, follows.c.follower_id.in_(user_ids))
+                ))
+            )
+            for follower_id, followed_id in rows:
+                if follower_id == current_user.id:
+                    statuses[followed_id]['is_following'] = True
+                else:
+                    statuses[follower_id]['follows_you'] = True
 
+        return jsonify({'statuses': {str(user_id): status for user_id, status in statuses.items()}}), 200
+    except Exception as e:
+        logger.error(f"Error checking follow statuses: {str(e)}")
         return jsonify({
-            'followers': followers_data,
-            'total': followers_paginated.total,
-            'pages': followers_paginated.pages,
-            'current_page': followers_paginated.page
+            'error': 'Failed to check follow status',
+            'details': str(e)
+        }), 500
+
+# --------------------------
+# People you may know
+# --------------------------
+@following_bp.route('/suggestions', methods=['GET'])
+@token_required
+def get_follow_suggestions(current_user):
+    """Friends-of-friends ranked by mutual follows, boosted by shared clubs"""
+    limit = max(1, min(request.args.get('limit', 20, type=int), MAX_SUGGESTIONS))
+    try:
+        graph = get_social_graph(current_app._get_current_object())
+        ranked = suggest_users(graph, current_user.id, limit)
+        users = {
+            user.id: user for user in
+            User.query.filter(User.id.in_([s['user_id'] for s in ranked]), User.is_active.is_(True))
+        } if ranked else {}
+
+        return jsonify({
+            'suggestions': [
+                dict(users[s['user_id']].to_public_dict(), mutual_count=s['mutual_count'],
+                     shared_clubs=s['shared_clubs'])
+                for s in ranked if s['user_id'] in users
+            ]
         }), 200
     except Exception as e:
-        logger.error(f"Error fetching followers: {str(e)}")
+        logger.error(f"Error building follow suggestions: {str(e)}")
         return jsonify({
-            'error': 'Failed to fetch followers',
+            'error': 'Failed to fetch suggestions',
             'details': str(e)
         }), 500
 
 # --------------------------
-# Get users followed by user
+# Users you follow who follow someone
 # --------------------------
-@following_bp.route('/<int:user_id>/following', methods=['GET'])
-def get_user_following(user_id):
+@following_bp.route('/<int:user_id>/mutual', methods=['GET'])
+@token_required
+def get_mutual_follows(current_user, user_id):
+    """People the current user follows who also follow user_id"""
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    User.query.get_or_404(user_id)
     try:
-        user = User.query.get_or_404(user_id)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        minimal = request.args.get('minimal', 'false').lower() == 'true'
+        mutual = get_social_graph(current_app._get_current_object()).mutual(current_user.id, user_id)
+        page = mutual[:limit].tolist()
+        users = User.query.filter(User.id.in_(page)).order_by(User.id).all() if page else []
 
-        following_paginated = user.get_following(page=page, per_page=per_page)
-
-        if minimal:
-            following_data = [{
+        return jsonify({
+            'user_id': user_id,
+            'count': len(mutual),
+            'users': [{
                 'id': user.id,
                 'username': user.username,
                 'avatar_url': user.avatar_url
-            } for user in following_paginated.items]
-        else:
-            following_data = [user.to_public_dict() for user in following_paginated.items]
+            } for user in users]
+        }), 200
+    except Exception as e:
+        logger.error(f"Error fetching mutual follows: {str(e)}")
+        return jsonify({
+            'error': 'Failed to fetch mutual follows',
+            'details': str(e)
+        }), 500
 
+def serialize_follow_user(user):
+    """Entry of a followers/following list; `minimal=true` drops the counts"""
+    if request.args.get('minimal', 'false').lower() == 'true':
+        return {
+            'id': user.id,
+            'username': user.username,
+            'avatar_url': user.avatar_url
+        }
+    return user.to_public_dict()
+
+# --------------------------
+# Get user's followers
+# --------------------------
+@following_bp.route('/<int:user_id>/followers', methods=['GET'])
+def get_user_followers(user_id):
+    user = User.query.get_or_404(user_id)
+    try:
+        return jsonify(follow_list_response(user, 'followers', serialize_follow_user)), 200
+    except ValueError:
+        return jsonify({'error': 'Invalid query parameters', 'code': 'INVALID_PAGINATION'}), 400
+    except Exception as e:
+        logger.error(f"Error fetching followers: {str(e)}")
         return jsonify({
-            'following': following_data,
-            'total': following_paginated.total,
-            'pages': following_paginated.pages,
-            'current_page': following_paginated.page
-        }), 200
+            'error': 'Failed to fetch followers',
+            'details': str(e)
+        }), 500
+
+# --------------------------
+# Get users followed by user
+# --------------------------
+@following_bp.route('/<int:user_id>/following', methods=['GET'])
+def get_user_following(user_id):
+    user = User.query.get_or_404(user_id)
+    try:
+        return jsonify(follow_list_response(user, 'following', serialize_follow_user)), 200
+    except ValueError:
+        return jsonify({'error': 'Invalid query parameters', 'code': 'INVALID_PAGINATION'}), 400
     except Exception as e:
         logger.error(f"Error fetching following: {str(e)}")
         return jsonify({
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Invite, User, BookClub
+from app.models import Invite, User, BookClub, Membership, ClubEvent
 from app.extensions import db
 from app.utils import invite_token_required, generate_invite_token
 from app.models.invite import InviteStatus
@@ -83,10 +83,18 @@ def accept_invite(token, invite_data):
         # Get the bookclub and user
         bookclub = BookClub.query.get(invite_data['bookclub_id'])
         user = User.query.get(invite_data['recipient_id'])
-
-        # Add user to bookclub members
-        if user not in bookclub.members:
-            bookclub.members.append(user)
+        if not bookclub or not user:
+            return jsonify({'error': 'Book club or user not found'}), 404
+
+        # Add user to bookclub members (member_count is kept by Membership events)
+        already_member = Membership.query.filter_by(
+            bookclub_id=bookclub.id,
+            user_id=user.id
+        ).first()
+        if not already_member:
+            db.session.add(Membership(bookclub_id=bookclub.id, user_id=user.id, role='member'))
+            ClubEvent.record(bookclub.id, ClubEvent.MEMBER_JOINED, actor_id=user.id, subject_id=user.id,
+                             payload={'role': 'member', 'invited_by': invite.sender_id})
 
         # Update invite status
         invite.status = 'ACCEPTED'
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import db  # ✅ CORRECT
 from app.schemas.meeting_schema import MeetingSchema  # Only import the schema
-from app.models import Meeting
+from app.models import Meeting, ClubEvent
 
 # Initialize the schema
 meeting_schema = MeetingSchema()
@@ -9,21 +9,32 @@ meetings_schema = MeetingSchema(many=True)
 
 meeting_bp = Blueprint('meeting', __name__)
 
+def meeting_event_payload(meeting):
+    meeting_date = meeting.meeting_date
+    return {
+        'meeting_date': meeting_date.isoformat() if hasattr(meeting_date, 'isoformat') else meeting_date,
+        'agenda': meeting.agenda
+    }
+
 # Create a new meeting
 @meeting_bp.route('/', methods=['POST'])
 def create_meeting():
     data = request.get_json()
     try:
-        # Validate the incoming data with the schema
-        meeting = meeting_schema.load(data)
+        # Validate the incoming data with the schema (load_instance builds the Meeting)
+        meeting = meeting_schema.load(data, session=db.session)
 
         # Create the meeting
         new_meeting = Meeting(
-            bookclub_id=meeting['bookclub_id'],
-            meeting_date=meeting['meeting_date'],
-            agenda=meeting['agenda']
+            bookclub_id=meeting.bookclub_id,
+            meeting_date=meeting.meeting_date,
+            agenda=meeting.agenda
         )
         db.session.add(new_meeting)
+        if new_meeting.bookclub_id is not None:
+            db.session.flush()  # Assigns the id the event refers to
+            ClubEvent.record(new_meeting.bookclub_id, ClubEvent.MEETING_SCHEDULED,
+                             subject_id=new_meeting.id, payload=meeting_event_payload(new_meeting))
         db.session.commit()
 
         return meeting_schema.jsonify(new_meeting), 201
@@ -58,6 +69,9 @@ def update_meeting(id):
         meeting.meeting_date = data.get('meeting_date', meeting.meeting_date)
         meeting.agenda = data.get('agenda', meeting.agenda)
 
+        if meeting.bookclub_id is not None:
+            ClubEvent.record(meeting.bookclub_id, ClubEvent.MEETING_UPDATED,
+                             subject_id=meeting.id, payload=meeting_event_payload(meeting))
         db.session.commit()
         return meeting_schema.jsonify(meeting)
 
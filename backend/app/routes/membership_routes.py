@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
-from app.models import Membership
+from sqlalchemy.exc import IntegrityError
+from app.models import Membership, ClubEvent, BookClub, User
 from app.extensions import db  # ✅ CORRECT
 from app.schemas.membership_schema import membership_schema, memberships_schema
 
 membership_bp = Blueprint('memberships', __name__)
 
+# Upper bound on user ids per bulk request
+MAX_BULK_MEMBERSHIPS = 1000
+
 @membership_bp.route('/memberships', methods=['GET'])
 def get_memberships():
     memberships = Membership.query.all()
@@ -24,10 +28,79 @@ def create_membership(bookclub_id):
         role=data.get('role', 'member'),
         status=data.get('status', 'active')  # Make sure status is included in the request
     )
-    db.session.add(membership)
-    db.session.commit()
+    try:
+        db.session.add(membership)
+        ClubEvent.record(bookclub_id, ClubEvent.MEMBER_JOINED, actor_id=membership.user_id,
+                         subject_id=membership.user_id, payload={'role': membership.role})
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'User is already a member of this club'}), 409
     return jsonify(membership_schema.dump(membership)), 201
 
+def parse_bulk_user_ids(data):
+    """Return (user_ids, error_response) for a bulk membership request body"""
+    user_ids = (data or {}).get('user_ids')
+    if not isinstance(user_ids, list) or not user_ids:
+        return None, (jsonify({'message': 'user_ids must be a non-empty list'}), 400)
+    if not all(isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids):
+        return None, (jsonify({'message': 'user_ids must be integers'}), 400)
+    user_ids = list(dict.fromkeys(user_ids))
+    if len(user_ids) > MAX_BULK_MEMBERSHIPS:
+        return None, (jsonify({'message': f'At most {MAX_BULK_MEMBERSHIPS} user_ids per request'}), 400)
+    return user_ids, None
+
+@membership_bp.route('/bookclubs/<int:bookclub_id>/memberships/bulk', methods=['POST'])
+def create_memberships_bulk(bookclub_id):
+    """Add many users to a club at once; users who are already members are skipped"""
+    data = request.get_json(silent=True)
+    user_ids, error_response = parse_bulk_user_ids(data)
+    if error_response:
+        return error_response
+    role = data.get('role', 'member')
+
+    if db.session.get(BookClub, bookclub_id) is None:
+        return jsonify({'message': 'Book club not found'}), 404
+
+    found = set(db.session.scalars(db.select(User.id).where(User.id.in_(user_ids))))
+    missing = [user_id for user_id in user_ids if user_id not in found]
+    if missing:
+        return jsonify({'message': 'Users not found', 'user_ids': missing}), 404
+
+    try:
+        added = Membership.add_many(bookclub_id, user_ids, role=role)
+        ClubEvent.record_many(bookclub_id, ClubEvent.MEMBER_JOINED, added, payload={'role': role})
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Failed to add members', 'error': str(e)}), 500
+
+    added_set = set(added)
+    return jsonify({
+        'added': [user_id for user_id in user_ids if user_id in added_set],
+        'skipped': [user_id for user_id in user_ids if user_id not in added_set]
+    }), 201
+
+@membership_bp.route('/bookclubs/<int:bookclub_id>/memberships/bulk', methods=['DELETE'])
+def delete_memberships_bulk(bookclub_id):
+    """Remove many users from a club at once; non-members are ignored"""
+    user_ids, error_response = parse_bulk_user_ids(request.get_json(silent=True))
+    if error_response:
+        return error_response
+
+    if db.session.get(BookClub, bookclub_id) is None:
+        return jsonify({'message': 'Book club not found'}), 404
+
+    try:
+        removed = Membership.remove_many(bookclub_id, user_ids)
+        ClubEvent.record_many(bookclub_id, ClubEvent.MEMBER_LEFT, removed)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': 'Failed to remove members', 'error': str(e)}), 500
+
+    return jsonify({'removed': sorted(removed)}), 200
+
 @membership_bp.route('/memberships/<int:id>', methods=['PUT'])
 def update_membership(id):
     membership = Membership.query.get_or_404(id)
@@ -45,5 +118,7 @@ def update_membership(id):
 def delete_membership(id):
     membership = Membership.query.get_or_404(id)
     db.session.delete(membership)
+    ClubEvent.record(membership.bookclub_id, ClubEvent.MEMBER_LEFT, actor_id=membership.user_id,
+                     subject_id=membership.user_id)
     db.session.commit()
     return jsonify({'message': 'Membership deleted'}), 200
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import User, follows
 from app.extensions import db
+from app.utils import follow_list_response
 
 profile_bp = Blueprint('profile', __name__, url_prefix='/api/users')
 
@@ -36,55 +37,50 @@ def get_follow_status(user_id):
 @profile_bp.route('/<int:user_id>/followers/count', methods=['GET'])
 def get_followers_count(user_id):
     count = db.session.execute(
-        db.select(db.func.count()).select_from(follows).where(
-            follows.c.followed_id == user_id
-        )
+        db.select(User.followers_count).where(User.id == user_id)
     ).scalar()
-    return jsonify({'count': count})
+    return jsonify({'count': count or 0})
 
 @profile_bp.route('/<int:user_id>/following/count', methods=['GET'])
 def get_following_count(user_id):
     count = db.session.execute(
-        db.select(db.func.count()).select_from(follows).where(
-            follows.c.follower_id == user_id
-        )
+        db.select(User.following_count).where(User.id == user_id)
     ).scalar()
-    return jsonify({'count': count})
-
-@profile_bp.route('/<int:user_id>/followers', methods=['GET'])
-def get_followers(user_id):
-    followers = db.session.query(User).join(
-        follows, follows.c.follower_id == User.id
-    ).filter(
-        follows.c.followed_id == user_id
-    ).all()
+    return jsonify({'count': count or 0})
 
-    return jsonify([{
+def serialize_profile_user(user):
+    return {
         'id': user.id,
         'username': user.username,
         'email': user.email,
         'avatar_url': user.avatar_url
-    } for user in followers])
+    }
+
+def follow_list(user_id, direction):
+    """The whole list, as before, unless `limit` or `after` asks for a keyset page"""
+    if 'limit' not in request.args and 'after' not in request.args:
+        user = db.session.get(User, user_id)
+        rows = user.follow_page(direction, None)[0] if user else []
+        return jsonify([serialize_profile_user(other) for other, _ in rows])
+
+    user = User.query.get_or_404(user_id)
+    try:
+        return jsonify(follow_list_response(user, direction, serialize_profile_user))
+    except ValueError:
+        return jsonify({'error': 'Invalid query parameters'}), 400
+
+@profile_bp.route('/<int:user_id>/followers', methods=['GET'])
+def get_followers(user_id):
+    return follow_list(user_id, 'followers')
 
 @profile_bp.route('/<int:user_id>/following', methods=['GET'])
 def get_following(user_id):
-    following = db.session.query(User).join(
-        follows, follows.c.followed_id == User.id
-    ).filter(
-        follows.c.follower_id == user_id
-    ).all()
-
-    return jsonify([{
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'avatar_url': user.avatar_url
-    } for user in following])
+    return follow_list(user_id, 'following')
 
 @profile_bp.route('/<int:user_id>/follow', methods=['POST'])
 @jwt_required()
 def follow_user(user_id):
-    current_user_id = get_jwt_identity()
+    current_user_id = int(get_jwt_identity())
 
     if current_user_id == user_id:
         return jsonify({'error': 'Cannot follow yourself'}), 400
@@ -104,6 +100,7 @@ def follow_user(user_id):
         followed_id=user_id
     )
     db.session.execute(insert_stmt)
+    User.adjust_follow_counts(current_user_id, user_id, 1)
     db.session.commit()
 
     print("DELETE /follow called")
@@ -115,7 +112,7 @@ def follow_user(user_id):
 @profile_bp.route('/<int:user_id>/follow', methods=['DELETE'])
 @jwt_required()
 def unfollow_user(user_id):
-    current_user_id = get_jwt_identity()
+    current_user_id = int(get_jwt_identity())
 
     existing_follow = db.session.execute(
         follows.select().where(
@@ -131,7 +128,8 @@ def unfollow_user(user_id):
         (follows.c.follower_id == current_user_id) &
         (follows.c.followed_id == user_id)
     )
-    db.session.execute(delete_stmt)
+    if db.session.execute(delete_stmt).rowcount:
+        User.adjust_follow_counts(current_user_id, user_id, -1)
     db.session.commit()
 
     return jsonify({'message': 'Successfully unfollowed user'}), 200
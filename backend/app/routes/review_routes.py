@@ -1,10 +1,23 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.models.review import Review
+from app.models.book_rating_stats import BookRatingStats
 from app.schemas.review_schema import review_schema, reviews_schema
 
 review_bp = Blueprint('review_bp', __name__, url_prefix='/reviews')
 
+def validate_rating(value):
+    """Ratings must be whole stars from 1 to 5; raises ValueError otherwise"""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError('Rating must be an integer from 1 to 5')
+    try:
+        rating = int(value)
+    except ValueError:
+        raise ValueError('Rating must be an integer from 1 to 5')
+    if not 1 <= rating <= 5:
+        raise ValueError('Rating must be an integer from 1 to 5')
+    return rating
+
 # GET all reviews
 @review_bp.route('/', methods=['GET'])
 def get_reviews():
@@ -21,16 +34,20 @@ def create_review():
     try:
         new_review = Review(
             content=data['content'],
-            rating=data['rating'],
+            rating=validate_rating(data['rating']),
             user_id=data['user_id'],
             book_id=data['book_id']
         )
         db.session.add(new_review)
+        BookRatingStats.apply(new_review.book_id, added=new_review.rating)
         db.session.commit()
         return review_schema.jsonify(new_review), 201
     except KeyError as e:
         return jsonify({"error": f"Missing field: {e}"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": "Failed to create review", "details": str(e)}), 500
 
 # GET single review
@@ -49,10 +66,17 @@ def update_review(id):
         review = Review.query.get_or_404(id)
         data = request.get_json()
         review.content = data.get('content', review.content)
-        review.rating = data.get('rating', review.rating)
+        if 'rating' in data:
+            rating = validate_rating(data['rating'])
+            if rating != review.rating:
+                BookRatingStats.apply(review.book_id, added=rating, removed=review.rating)
+                review.rating = rating
         db.session.commit()
         return review_schema.jsonify(review), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": "Failed to update review", "details": str(e)}), 500
 
 # DELETE review
@@ -60,10 +84,12 @@ def update_review(id):
 def delete_review(id):
     try:
         review = Review.query.get_or_404(id)
+        BookRatingStats.apply(review.book_id, removed=review.rating)
         db.session.delete(review)
         db.session.commit()
         return jsonify({"message": "Review deleted"}), 200
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": "Failed to delete review", "details": str(e)}), 500
     
 
@@ -75,6 +101,11 @@ def create_review_for_book(book_id):
     if not data or 'content' not in data or 'rating' not in data or 'user_id' not in data:
         return jsonify({'error': 'Missing required fields: content, rating, user_id'}), 400
 
+    try:
+        rating = validate_rating(data['rating'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     # Verify the book exists
     from app.models.book import Book  # Import only if not already imported at the top
     book = Book.query.get(book_id)
@@ -90,11 +121,12 @@ def create_review_for_book(book_id):
     try:
         new_review = Review(
             content=data['content'],
-            rating=data['rating'],
+            rating=rating,
             user_id=data['user_id'],
             book_id=book_id
         )
         db.session.add(new_review)
+        BookRatingStats.apply(book_id, added=rating)
         db.session.commit()
         return review_schema.jsonify(new_review), 201
     except Exception as e:
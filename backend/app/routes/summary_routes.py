@@ -3,6 +3,7 @@ from app.extensions import db
 from app.models.summary import Summary
 from app.models.user import User
 from app.models.bookclub import BookClub
+from app.models.club_event import ClubEvent
 from app.schemas.summary_schema import summary_schema, summaries_schema
 
 summary_bp = Blueprint('summary_bp', __name__, url_prefix='/summaries')
@@ -99,6 +100,10 @@ def create_summary():
         )
 
         db.session.add(new_summary)
+        if bookclub_id is not None:
+            db.session.flush()  # Assigns the id the event refers to
+            ClubEvent.record(bookclub_id, ClubEvent.SUMMARY_POSTED, actor_id=user_id,
+                             subject_id=new_summary.id, payload={'excerpt': content[:200]})
         db.session.commit()
 
         print("Successfully created summary:", new_summary.id)
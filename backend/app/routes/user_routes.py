@@ -3,6 +3,7 @@ from werkzeug.security import generate_password_hash
 from datetime import datetime
 from app.extensions import db
 from app.models.user import User
+from app.utils import follow_list_response
 from typing import Dict, Any
 
 
@@ -203,20 +204,11 @@ def get_default_avatar():
 # Get user's followers
 @user_bp.route('/<int:user_id>/followers', methods=['GET'])
 def get_user_followers(user_id):
+    user = User.query.get_or_404(user_id)
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-       
-        user = User.query.get_or_404(user_id)
-        followers_paginated = user.followers.paginate(page=page, per_page=per_page, error_out=False)
-
-
-        return jsonify({
-            'followers': [follower.to_dict() for follower in followers_paginated.items],
-            'total': followers_paginated.total,
-            'pages': followers_paginated.pages,
-            'current_page': followers_paginated.page
-        }), 200
+        return jsonify(follow_list_response(user, 'followers', User.to_dict)), 200
+    except ValueError:
+        return jsonify({'error': 'Invalid query parameters'}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch followers', 'details': str(e)}), 500
 
@@ -224,20 +216,11 @@ def get_user_followers(user_id):
 # Get users followed by a user
 @user_bp.route('/<int:user_id>/following', methods=['GET'])
 def get_user_following(user_id):
+    user = User.query.get_or_404(user_id)
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-       
-        user = User.query.get_or_404(user_id)
-        following_paginated = user.following.paginate(page=page, per_page=per_page, error_out=False)
-
-
-        return jsonify({
-            'following': [followed.to_dict() for followed in following_paginated.items],
-            'total': following_paginated.total,
-            'pages': following_paginated.pages,
-            'current_page': following_paginated.page
-        }), 200
+        return jsonify(follow_list_response(user, 'following', User.to_dict)), 200
+    except ValueError:
+        return jsonify({'error': 'Invalid query parameters'}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch following', 'details': str(e)}), 500
 
@@ -5,3 +5,4 @@ class BookSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Book
         load_instance = True
+        exclude = ('search_vector',)
@@ -0,0 +1,118 @@
+"""Delete a book club and everything that hangs off it with set-based SQL.
+
+``session.delete(club)`` would load every membership, summary and meeting
+through the ORM cascades and delete them row by row. Here each child table
+is cleared with one DELETE ... WHERE bookclub_id = :id instead, which works
+the same with or without ON DELETE CASCADE foreign keys.
+
+Very large clubs can be deleted in the background instead: the club is
+marked with DELETING_STATUS and its rows are removed in fixed-size chunks,
+one short transaction each, so no request or lock is held for minutes. If
+the process dies part-way through, ``flask clubs purge-deleting`` resumes.
+"""
+import logging
+import threading
+from typing import Dict
+
+from sqlalchemy import and_, delete, select, tuple_
+
+from app.extensions import db
+from app.models.bookclub import BookClub
+from app.models.club_daily_stats import ClubDailyStats
+from app.models.club_event import ClubEvent
+from app.models.club_trending_score import ClubTrendingScore
+from app.models.invite import Invite
+from app.models.meeting import Meeting
+from app.models.membership import Membership
+from app.models.reading_progress import ReadingProgress
+from app.models.summary import Summary
+from app.models.timeline_entry import TimelineEntry
+
+logger = logging.getLogger(__name__)
+
+DELETING_STATUS = 'Deleting'
+CHUNK_SIZE = 5000
+
+# Every table with a bookclub_id column, in a foreign-key-safe order
+CHILD_TABLES = [
+    ClubDailyStats.__table__,
+    ClubTrendingScore.__table__,
+    ClubEvent.__table__,
+    ReadingProgress.__table__,
+    Invite.__table__,
+    Summary.__table__,
+    Meeting.__table__,
+    Membership.__table__,
+]
+
+# Rows reached through the club's rows rather than a bookclub_id column; cleared first
+DEPENDENT_TABLES = [
+    TimelineEntry.__table__,
+]
+
+
+def _club_rows(table, club_id: int):
+    if table is TimelineEntry.__table__:
+        # Home feed copies of the club's summaries
+        return and_(
+            table.c.item_type == TimelineEntry.SUMMARY,
+            table.c.item_id.in_(select(Summary.id).where(Summary.bookclub_id == club_id))
+        )
+    return table.c.bookclub_id == club_id
+
+
+def delete_club(club_id: int) -> Dict[str, int]:
+    """Delete the club and its rows in the current transaction; caller commits.
+
+    Returns the number of rows removed per table.
+    """
+    removed = {}
+    for table in DEPENDENT_TABLES + CHILD_TABLES:
+        removed[table.name] = db.session.execute(
+            delete(table).where(_club_rows(table, club_id))
+        ).rowcount
+    removed[BookClub.__tablename__] = db.session.execute(
+        delete(BookClub.__table__).where(BookClub.__table__.c.id == club_id)
+    ).rowcount
+    return removed
+
+
+def delete_club_chunked(club_id: int, chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
+    """Delete the club's rows chunk by chunk, committing after each chunk"""
+    removed = {}
+    for table in DEPENDENT_TABLES + CHILD_TABLES:
+        key = tuple_(*table.primary_key.columns)
+        chunk = select(*table.primary_key.columns).where(_club_rows(table, club_id)).limit(chunk_size)
+        removed[table.name] = 0
+        while True:
+            count = db.session.execute(delete(table).where(key.in_(chunk))).rowcount
+            db.session.commit()
+            removed[table.name] += count
+            if count < chunk_size:
+                break
+    removed[BookClub.__tablename__] = db.session.execute(
+        delete(BookClub.__table__).where(BookClub.__table__.c.id == club_id)
+    ).rowcount
+    db.session.commit()
+    return removed
+
+
+def start_background_delete(app, club_id: int):
+    """Mark the club as being deleted and remove it from a background thread"""
+    db.session.execute(
+        BookClub.__table__.update().where(BookClub.__table__.c.id == club_id).values(status=DELETING_STATUS)
+    )
+    db.session.commit()
+
+    def run():
+        with app.app_context():
+            try:
+                removed = delete_club_chunked(club_id)
+                logger.info('Deleted club %s in the background: %s', club_id, removed)
+            except Exception:
+                db.session.rollback()
+                logger.exception('Background deletion of club %s failed; rerun flask clubs purge-deleting', club_id)
+            finally:
+                db.session.remove()
+
+    threading.Thread(target=run, name=f'delete-club-{club_id}', daemon=True).start()
@@ -0,0 +1,225 @@
+"""Daily per-club activity rollups behind ``/bookclubs/<id>/stats``.
+
+The dashboard reads club_daily_stats, a few hundred small rows per club,
+instead of grouping memberships, summaries and meetings on every load. The
+rollup is refreshed incrementally by ``flask clubs refresh-stats``:
+
+* members_joined / summaries_posted count rows past id watermarks on
+  memberships and summaries, bucketed by joined_at / created_at;
+* members_left counts member_left rows past a club_events watermark;
+* meetings_held counts meetings whose meeting_date passed since the last run;
+* pages_read snapshots the members' total pages for clubs whose reading
+  progress changed since the last run.
+
+Counters and watermarks are committed together, so each row is counted once.
+A row committed with an id below a watermark that has already moved past it
+(a long-running transaction) is missed until the next ``--full`` rebuild.
+A full rebuild in turn only sees the joins of members still in the club,
+since a removed membership leaves no row behind.
+"""
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+
+from app.extensions import db
+from app.models.club_daily_stats import ClubDailyStats
+from app.models.club_event import ClubEvent
+from app.models.job_watermark import JobWatermark
+from app.models.meeting import Meeting
+from app.models.membership import Membership
+from app.models.reading_progress import ReadingProgress
+from app.models.summary import Summary
+from app.utils import dialect_insert
+
+MEMBERSHIPS_WATERMARK = 'club_daily_stats.memberships'
+SUMMARIES_WATERMARK = 'club_daily_stats.summaries'
+EVENTS_WATERMARK = 'club_daily_stats.club_events'
+# Epoch seconds of the previous run, for the time-based sources
+CLOCK_WATERMARK = 'club_daily_stats.clock'
+
+# Reading progress is written a few seconds after it is stamped, so look back a little further
+PROGRESS_LOOKBACK = timedelta(minutes=5)
+
+
+def _day(column):
+    return func.date(column, type_=db.Date)
+
+
+def _increment(counter: str, rows: Iterable[Tuple[int, date, int]], now: datetime) -> int:
+    """Add (club, day, n) counts to one counter column, creating rows as needed"""
+    rows = [
+        {'bookclub_id': club_id, 'day': day, counter: count, 'updated_at': now}
+        for club_id, day, count in rows
+    ]
+    if not rows:
+        return 0
+    table = ClubDailyStats.__table__
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.bookclub_id, table.c.day],
+        set_={counter: table.c[counter] + stmt.excluded[counter], 'updated_at': stmt.excluded.updated_at}
+    )
+    db.session.execute(stmt, rows)
+    return len(rows)
+
+
+def _count_by_day(id_column, club_column, time_column, since_id: int, max_id: int, *criteria):
+    return db.session.execute(
+        select(club_column, _day(time_column), func.count())
+        .where(id_column > since_id, id_column <= max_id, club_column.isnot(None), time_column.isnot(None),
+               *criteria)
+        .group_by(club_column, _day(time_column))
+    ).all()
+
+
+def _max_id(column) -> int:
+    return db.session.scalar(select(func.coalesce(func.max(column), 0)))
+
+
+def refresh_club_stats(full: bool = False) -> Dict[str, int]:
+    """Roll activity since the last run into club_daily_stats and commit.
+
+    With full=True the table is rebuilt from scratch. Returns the number of
+    day rows touched per source.
+    """
+    now = datetime.utcnow()
+    # Meetings are counted up to this bound, which is also stored as the next run's start
+    until = now.replace(microsecond=0)
+    if full:
+        db.session.execute(delete(ClubDailyStats))
+        since_membership = since_summary = since_event = 0
+        since_time: Optional[datetime] = None
+    else:
+        since_membership = JobWatermark.get(MEMBERSHIPS_WATERMARK)
+        since_summary = JobWatermark.get(SUMMARIES_WATERMARK)
+        since_event = JobWatermark.get(EVENTS_WATERMARK)
+        clock = JobWatermark.get(CLOCK_WATERMARK)
+        since_time = datetime.utcfromtimestamp(clock) if clock else None
+
+    max_membership = _max_id(Membership.id)
+    max_summary = _max_id(Summary.id)
+    max_event = _max_id(ClubEvent.id)
+
+    touched = {
+        'members_joined': _increment('members_joined', _count_by_day(
+            Membership.id, Membership.bookclub_id, Membership.joined_at, since_membership, max_membership
+        ), now),
+        'members_left': _increment('members_left', _count_by_day(
+            ClubEvent.id, ClubEvent.bookclub_id, ClubEvent.created_at, since_event, max_event,
+            ClubEvent.event_type == ClubEvent.MEMBER_LEFT
+        ), now),
+        'summaries_posted': _increment('summaries_posted', _count_by_day(
+            Summary.id, Summary.bookclub_id, Summary.created_at, since_summary, max_summary
+        ), now),
+    }
+
+    held = select(Meeting.bookclub_id, _day(Meeting.meeting_date), func.count()).where(
+        Meeting.bookclub_id.isnot(None), Meeting.meeting_date <= until
+    )
+    if since_time is not None:
+        held = held.where(Meeting.meeting_date > since_time)
+    touched['meetings_held'] = _increment(
+        'meetings_held', db.session.execute(held.group_by(Meeting.bookclub_id, _day(Meeting.meeting_date))), now
+    )
+    touched['pages_read'] = _snapshot_pages(since_time, now)
+
+    JobWatermark.set(MEMBERSHIPS_WATERMARK, max_membership)
+    JobWatermark.set(SUMMARIES_WATERMARK, max_summary)
+    JobWatermark.set(EVENTS_WATERMARK, max_event)
+    JobWatermark.set(CLOCK_WATERMARK, calendar.timegm(until.timetuple()))
+    db.session.commit()
+    return touched
+
+
+def _snapshot_pages(since_time: Optional[datetime], now: datetime) -> int:
+    """Store today's total pages read for clubs whose progress changed since since_time"""
+    totals = select(ReadingProgress.bookclub_id, func.sum(func.coalesce(ReadingProgress.pages_read, 0)))
+    if since_time is not None:
+        changed = select(ReadingProgress.bookclub_id).where(
+            ReadingProgress.updated_at > since_time - PROGRESS_LOOKBACK
+        )
+        totals = totals.where(ReadingProgress.bookclub_id.in_(changed))
+    rows = [
+        {'bookclub_id': club_id, 'day': now.date(), 'pages_read': int(pages), 'updated_at': now}
+        for club_id, pages in db.session.execute(totals.group_by(ReadingProgress.bookclub_id))
+    ]
+    if not rows:
+        return 0
+    table = ClubDailyStats.__table__
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.bookclub_id, table.c.day],
+        set_={'pages_read': stmt.excluded.pages_read, 'updated_at': stmt.excluded.updated_at}
+    )
+    db.session.execute(stmt, rows)
+    return len(rows)
+
+
+def last_refreshed() -> Optional[datetime]:
+    """When the rollup was last refreshed, or None if it never has been"""
+    clock = JobWatermark.get(CLOCK_WATERMARK)
+    return datetime.utcfromtimestamp(clock) if clock else None
+
+
+def club_stats(club_id: int, start: date, end: date) -> Dict:
+    """Daily and weekly series for one club between start and end inclusive"""
+    stats = ClubDailyStats
+    rows = {
+        row.day: row for row in db.session.scalars(
+            select(stats).where(stats.bookclub_id == club_id, stats.day >= start, stats.day <= end)
+        )
+    }
+    # Running member count and the last pages snapshot carried in from before the window
+    members = db.session.scalar(
+        select(func.coalesce(func.sum(stats.members_joined - stats.members_left), 0))
+        .where(stats.bookclub_id == club_id, stats.day < start)
+    )
+    pages = db.session.scalar(
+        select(stats.pages_read)
+        .where(stats.bookclub_id == club_id, stats.day < start, stats.pages_read.isnot(None))
+        .order_by(stats.day.desc())
+        .limit(1)
+    )
+
+    days, weeks = [], {}
+    day = start
+    while day <= end:
+        row = rows.get(day)
+        joined = row.members_joined if row else 0
+        left = row.members_left if row else 0
+        velocity = 0
+        if row is not None and row.pages_read is not None:
+            if pages is not None:
+                velocity = max(row.pages_read - pages, 0)
+            pages = row.pages_read
+        members += joined - left
+        entry = {
+            'date': day.isoformat(),
+            'members_joined': joined,
+            'members_left': left,
+            'member_count': members,
+            'summaries_posted': row.summaries_posted if row else 0,
+            'meetings_held': row.meetings_held if row else 0,
+            'pages_read': velocity
+        }
+        days.append(entry)
+
+        week_start = (day - timedelta(days=day.weekday())).isoformat()
+        week = weeks.setdefault(week_start, {
+            'week_start': week_start, 'members_joined': 0, 'members_left': 0,
+            'summaries_posted': 0, 'meetings_held': 0, 'pages_read': 0
+        })
+        for key in ('members_joined', 'members_left', 'summaries_posted', 'meetings_held', 'pages_read'):
+            week[key] += entry[key]
+        day += timedelta(days=1)
+
+    return {
+        'days': days,
+        'weeks': list(weeks.values()),
+        'totals': {
+            key: sum(entry[key] for entry in days)
+            for key in ('members_joined', 'members_left', 'summaries_posted', 'meetings_held', 'pages_read')
+        }
+    }
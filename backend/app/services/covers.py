@@ -0,0 +1,261 @@
+"""Cover thumbnail proxy backed by a content-addressed on-disk cache.
+
+Remote covers are fetched and resized once, off the request thread, by a
+small worker pool. Thumbnails are stored under the SHA-256 of their bytes
+(``blobs/``), with a per (source URL, size) pointer file (``refs/``) so the
+same image referenced by several books is stored once. Blobs are evicted
+least-recently-used once the cache grows past its byte budget.
+"""
+import hashlib
+import http.client
+import io
+import ipaddress
+import logging
+import os
+import socket
+import tempfile
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for each requested size
+SIZES = {'s': 96, 'm': 240, 'l': 480}
+
+FETCH_TIMEOUT = 10
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+JPEG_QUALITY = 85
+
+Fetcher = Callable[[str], bytes]
+
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _create_public_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    """socket.create_connection that refuses hosts resolving to non-public addresses.
+
+    Checked on every connection, so redirects and DNS changes between
+    lookups can't reach loopback, private, link-local or reserved ranges.
+    """
+    host, port = address
+    resolved = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    if not resolved or not all(_is_public_address(sockaddr[0]) for *_, sockaddr in resolved):
+        raise ValueError(f'Cover host is not a public address: {host}')
+    family, type_, proto, _, sockaddr = resolved[0]
+    sock = socket.socket(family, type_, proto)
+    try:
+        if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+            sock.settimeout(timeout)
+        if source_address:
+            sock.bind(source_address)
+        sock.connect(sockaddr)
+        return sock
+    except OSError:
+        sock.close()
+        raise
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_public_connection
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        kwargs = {'context': self._context}
+        if hasattr(self, '_check_hostname'):
+            kwargs['check_hostname'] = self._check_hostname
+        return self.do_open(_PublicHTTPSConnection, req, **kwargs)
+
+
+def _build_opener() -> urllib.request.OpenerDirector:
+    # Only http(s), no environment proxies; redirects are followed through the same handlers
+    opener = urllib.request.OpenerDirector()
+    for handler in (_PublicHTTPHandler(), _PublicHTTPSHandler(), urllib.request.HTTPRedirectHandler(),
+                    urllib.request.HTTPDefaultErrorHandler(), urllib.request.HTTPErrorProcessor()):
+        opener.add_handler(handler)
+    return opener
+
+
+_opener = _build_opener()
+
+
+def fetch_url(url: str) -> bytes:
+    """Default fetcher: download a public http(s) URL, refusing oversized bodies"""
+    if urlparse(url).scheme not in ('http', 'https'):
+        raise ValueError(f'Unsupported cover URL scheme: {url}')
+    request = urllib.request.Request(url, headers={'User-Agent': 'bookclub-cover-proxy'})
+    with _opener.open(request, timeout=FETCH_TIMEOUT) as response:
+        data = response.read(MAX_SOURCE_BYTES + 1)
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f'Cover image exceeds {MAX_SOURCE_BYTES} bytes: {url}')
+    return data
+
+
+def resize_image(data: bytes, edge: int) -> bytes:
+    """Downscale to fit within edge x edge as JPEG; passes data through without Pillow"""
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.warning('Pillow is not installed; caching covers at original size')
+        return data
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((edge, edge))
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        out = io.BytesIO()
+        image.save(out, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+        return out.getvalue()
+
+
+def sniff_mimetype(head: bytes) -> str:
+    if head.startswith(b'\xff\xd8'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG'):
+        return 'image/png'
+    if head.startswith(b'GIF8'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'application/octet-stream'
+
+
+class CoverCache:
+    def __init__(self, directory: str, max_bytes: int, fetcher: Optional[Fetcher] = None, workers: int = 4):
+        self.blob_dir = os.path.join(directory, 'blobs')
+        self.ref_dir = os.path.join(directory, 'refs')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.ref_dir, exist_ok=True)
+
+        self.max_bytes = max_bytes
+        self.fetcher = fetcher or fetch_url
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cover')
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._total_bytes = sum(
+            entry.stat().st_size for entry in os.scandir(self.blob_dir) if entry.is_file()
+        )
+
+    @staticmethod
+    def _ref_key(url: str, size: str) -> str:
+        return hashlib.sha256(f'{size}|{url}'.encode()).hexdigest()
+
+    def blob_path(self, digest: str) -> Optional[str]:
+        """Path of a cached thumbnail, marking it recently used; None if evicted"""
+        if len(digest) != 64 or any(c not in '0123456789abcdef' for c in digest):
+            return None
+        path = os.path.join(self.blob_dir, digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def lookup(self, url: str, size: str) -> Optional[str]:
+        """Digest of the ready thumbnail for (url, size), or None if not cached"""
+        ref = os.path.join(self.ref_dir, self._ref_key(url, size))
+        try:
+            with open(ref) as f:
+                digest = f.read().strip()
+        except FileNotFoundError:
+            return None
+        if self.blob_path(digest) is None:
+            return None
+        return digest
+
+    def schedule(self, url: str, size: str):
+        """Queue thumbnail generation unless it is already running"""
+        key = self._ref_key(url, size)
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self._in_flight.add(key)
+        self._executor.submit(self._generate, key, url, size)
+
+    def _generate(self, key: str, url: str, size: str):
+        try:
+            thumbnail = resize_image(self.fetcher(url), SIZES[size])
+            digest = hashlib.sha256(thumbnail).hexdigest()
+            path = os.path.join(self.blob_dir, digest)
+            if not os.path.exists(path):
+                self._write_atomic(path, thumbnail)
+                with self._lock:
+                    self._total_bytes += len(thumbnail)
+            self._write_atomic(os.path.join(self.ref_dir, key), digest.encode())
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        except Exception:
+            logger.exception('Failed to build %s cover thumbnail for %s', size, url)
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _evict(self):
+        """Delete least-recently-used blobs until the cache is under 90% of its budget"""
+        with self._lock:
+            entries = sorted(
+                (entry for entry in os.scandir(self.blob_dir) if entry.is_file()),
+                key=lambda entry: entry.stat().st_mtime
+            )
+            target = self.max_bytes * 0.9
+            for entry in entries:
+                if self._total_bytes <= target:
+                    break
+                size = entry.stat().st_size
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    continue
+                self._total_bytes -= size
+        # Dangling refs are treated as misses by lookup() and rewritten on regeneration
+
+
+_create_lock = threading.Lock()
+
+
+def get_cover_cache(app) -> CoverCache:
+    """The application's CoverCache, created on first use"""
+    with _create_lock:
+        cache = app.extensions.get('cover_cache')
+        if cache is not None:
+            return cache
+        cache = CoverCache(
+            directory=app.config.get('COVER_CACHE_DIR') or os.path.join(app.instance_path, 'covers'),
+            max_bytes=app.config.get('COVER_CACHE_MAX_BYTES', 512 * 1024 * 1024),
+            fetcher=app.config.get('COVER_FETCHER'),
+            workers=app.config.get('COVER_WORKERS', 4)
+        )
+        app.extensions['cover_cache'] = cache
+        return cache
@@ -0,0 +1,150 @@
+"""Near-duplicate detection over books.normalized_key.
+
+Candidates are found through a trigram index rather than by comparing
+every pair of books: pg_trgm's GIN index on PostgreSQL, or an in-process
+trigram inverted index elsewhere. Similarity is the Jaccard overlap of the
+two keys' trigram sets, which matches pg_trgm's ``similarity()``.
+"""
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.models.book import Book
+from app.services.search import MemoryBookIndex
+
+DEFAULT_THRESHOLD = 0.8
+
+
+def trigrams(key: str) -> Set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing space"""
+    grams = set()
+    for word in key.replace('|', ' ').split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex(MemoryBookIndex):
+    def clear(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._grams: Dict[int, Set[str]] = {}
+        self._keys: Dict[int, str] = {}
+
+    def add(self, book_id: int, doc):
+        key = Book.duplicate_key(doc['title'], doc['author'])
+        grams = trigrams(key)
+        self._keys[book_id] = key
+        self._grams[book_id] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(book_id)
+
+    def remove(self, book_id: int):
+        self._keys.pop(book_id, None)
+        for gram in self._grams.pop(book_id, ()):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(book_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def similar(self, key: str, threshold: float, min_id: int = 0) -> List[Tuple[int, float]]:
+        """(book_id, similarity) for books with id > min_id, most similar first"""
+        grams = trigrams(key)
+        if not grams:
+            return []
+        self.ensure_built()
+        with self._lock:
+            # Prefix filter: a book reaching the threshold must share at least
+            # one of the query's (|A| - ceil(t*|A|) + 1) rarest trigrams, so only
+            # those postings are scanned; overlap is then computed exactly.
+            ranked = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+            prefix = len(grams) - math.ceil(threshold * len(grams)) + 1
+            candidates = set()
+            for gram in ranked[:prefix]:
+                candidates.update(self._postings.get(gram, ()))
+
+            matches = []
+            for book_id in candidates:
+                if book_id <= min_id:
+                    continue
+                other = self._grams[book_id]
+                overlap = len(grams & other)
+                score = overlap / (len(grams) + len(other) - overlap)
+                if score >= threshold:
+                    matches.append((book_id, score))
+            matches.sort(key=lambda match: (-match[1], match[0]))
+            return matches
+
+    def pairs(self, threshold: float, limit: int, after: Tuple[int, int]) -> List[Tuple[int, int, float]]:
+        self.ensure_built()
+        with self._lock:
+            first_id, last_other = after
+            found = []
+            for book_id in sorted(i for i in self._keys if i >= first_id):
+                min_other = last_other if book_id == first_id else book_id
+                matches = self.similar(self._keys[book_id], threshold, min_id=min_other)
+                for other_id, score in sorted(matches):
+                    found.append((book_id, other_id, score))
+                    if len(found) >= limit:
+                        return found
+            return found
+
+
+trigram_index = TrigramIndex()
+
+
+def _use_pg_trgm() -> bool:
+    return db.engine.dialect.name == 'postgresql'
+
+
+def _set_pg_threshold(threshold: float):
+    # Lets the % operator (and so the GIN index) filter at our threshold
+    db.session.execute(
+        text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+        {'threshold': str(threshold)}
+    )
+
+
+def find_similar(title: str, author: str, threshold: float = DEFAULT_THRESHOLD,
+                 limit: int = 5, exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+    """Books whose normalized title and author resemble the given ones"""
+    key = Book.duplicate_key(title, author)
+
+    if _use_pg_trgm():
+        _set_pg_threshold(threshold)
+        score = func.similarity(Book.normalized_key, key)
+        stmt = (
+            select(Book.id, score.label('score'))
+            .where(Book.normalized_key.op('%')(key))
+            .order_by(score.desc(), Book.id)
+            .limit(limit)
+        )
+        if exclude_id is not None:
+            stmt = stmt.where(Book.id != exclude_id)
+        return [(row.id, float(row.score)) for row in db.session.execute(stmt)]
+
+    matches = trigram_index.similar(key, threshold)
+    return [m for m in matches if m[0] != exclude_id][:limit]
+
+
+def find_duplicate_pairs(threshold: float = DEFAULT_THRESHOLD, limit: int = 50,
+                         after: Tuple[int, int] = (0, 0)) -> List[Tuple[int, int, float]]:
+    """(book_id, duplicate_id, similarity) pairs with book_id < duplicate_id,
+    ordered by (book_id, duplicate_id) and starting after the given pair"""
+    if _use_pg_trgm():
+        _set_pg_threshold(threshold)
+        other = aliased(Book)
+        score = func.similarity(Book.normalized_key, other.normalized_key)
+        stmt = (
+            select(Book.id, other.id.label('other_id'), score.label('score'))
+            .join(other, Book.normalized_key.op('%')(other.normalized_key) & (Book.id < other.id))
+            .where(tuple_(Book.id, other.id) > after)
+            .order_by(Book.id, other.id)
+            .limit(limit)
+        )
+        return [(row.id, row.other_id, float(row.score)) for row in db.session.execute(stmt)]
+
+    return trigram_index.pairs(threshold, limit, after)
@@ -0,0 +1,134 @@
+"""Write-behind buffer for members' reading-progress pings.
+
+Progress pings are the highest-volume write in the app, and only the latest
+value per (club, member) matters. Updates are therefore coalesced in memory
+and written by a background thread every few seconds as one multi-row
+upsert. The upsert only replaces a row with a newer reading, so a late
+flush never moves progress backwards. Pings still buffered when a worker
+dies, or in a batch whose write fails, are lost; the member's next ping
+repairs that, which is acceptable for progress data.
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from app.extensions import db
+from app.models.reading_progress import ReadingProgress
+from app.services.pubsub import hub
+from app.utils import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# (pages_read, percent, updated_at); None leaves the stored value unchanged
+Reading = Tuple[Optional[int], Optional[float], datetime]
+
+
+class ProgressBuffer:
+    def __init__(self, app, interval: float = 5.0, max_pending: int = 10000):
+        self.app = app
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[int, int], Reading] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def record(self, club_id: int, user_id: int, pages_read: Optional[int], percent: Optional[float]):
+        """Queue a reading; with interval <= 0 it is written immediately"""
+        reading = (pages_read, percent, datetime.utcnow())
+        with self._lock:
+            previous = self._pending.get((club_id, user_id))
+            if previous is not None:
+                # A ping carrying only one field keeps the other from the earlier ping
+                reading = (
+                    pages_read if pages_read is not None else previous[0],
+                    percent if percent is not None else previous[1],
+                    reading[2]
+                )
+            self._pending[(club_id, user_id)] = reading
+            backlog = len(self._pending)
+
+        if self.interval <= 0:
+            self.flush()
+            return
+        self._ensure_thread()
+        if backlog >= self.max_pending:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of rows upserted"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+
+        rows = [
+            {'bookclub_id': club_id, 'user_id': user_id, 'pages_read': pages, 'percent': percent, 'updated_at': at}
+            for (club_id, user_id), (pages, percent, at) in batch.items()
+        ]
+        with self.app.app_context():
+            try:
+                table = ReadingProgress.__table__
+                stmt = dialect_insert(table)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.bookclub_id, table.c.user_id],
+                    set_={
+                        'pages_read': db.func.coalesce(stmt.excluded.pages_read, table.c.pages_read),
+                        'percent': db.func.coalesce(stmt.excluded.percent, table.c.percent),
+                        'updated_at': stmt.excluded.updated_at
+                    },
+                    where=table.c.updated_at < stmt.excluded.updated_at
+                )
+                db.session.execute(stmt, rows)
+                db.session.commit()
+            except Exception:
+                # Dropped rather than requeued so one bad row can't wedge every later flush
+                db.session.rollback()
+                logger.exception('Failed to flush %d reading-progress updates', len(rows))
+                return 0
+            finally:
+                db.session.remove()
+
+        # Let live club streams know to refresh their progress view
+        hub.publish_many([
+            (club_id, {'type': 'progress_updated', 'data': {'bookclub_id': club_id}})
+            for club_id in {club_id for club_id, _ in batch}
+        ])
+        return len(rows)
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='progress-flush', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Reading-progress flush loop error')
+
+
+_create_lock = threading.Lock()
+
+
+def get_progress_buffer(app) -> ProgressBuffer:
+    """The application's ProgressBuffer, created on first use"""
+    with _create_lock:
+        buffer = app.extensions.get('progress_buffer')
+        if buffer is None:
+            buffer = ProgressBuffer(
+                app,
+                interval=app.config.get('PROGRESS_FLUSH_INTERVAL', 5.0),
+                max_pending=app.config.get('PROGRESS_MAX_PENDING', 10000)
+            )
+            app.extensions['progress_buffer'] = buffer
+        return buffer
@@ -0,0 +1,217 @@
+"""In-process publish/subscribe hub feeding the club Server-Sent Events streams.
+
+Committed ClubEvent rows are published to their club's channel, and
+subscribers (one per open SSE connection) receive them through a bounded
+queue. A subscriber that falls too far behind is cut off rather than
+buffering without limit; its client reconnects with Last-Event-ID and
+replays the gap from club_events.
+
+Committed follow changes are published the same way, on FOLLOW_CHANNEL,
+for app.services.social_graph.
+
+Each worker process has its own hub. With several workers (or hosts), set
+PUBSUB_PG_NOTIFY so that publishes go through PostgreSQL NOTIFY and every
+worker's listener thread fans them out to its local subscribers.
+"""
+import json
+import logging
+import queue
+import select
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.models.club_event import ClubEvent
+from app.models.user import FOLLOW_CHANGES_KEY
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'club_events'
+FOLLOW_CHANNEL = 'follows'
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class Subscription:
+    def __init__(self, hub: 'Hub', channel: Any):
+        self.hub = hub
+        self.channel = channel
+        self.overflowed = False
+        self._queue: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next message, or None if nothing arrived within timeout seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _deliver(self, message: Dict[str, Any]):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class Hub:
+    def __init__(self):
+        self._subscribers: Dict[Any, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.bridge: Optional['PostgresBridge'] = None
+
+    def subscribe(self, channel: Any) -> Subscription:
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel: Any, message: Dict[str, Any]):
+        """Send to every subscriber of channel, across workers when bridged"""
+        self.publish_many([(channel, message)])
+
+    def publish_many(self, messages: List[Tuple[Any, Dict[str, Any]]]):
+        """Publish (channel, message) pairs in order; bridged, as one round trip"""
+        if not messages:
+            return
+        if self.bridge is not None:
+            self.bridge.notify_many(messages)
+        else:
+            for channel, message in messages:
+                self.deliver(channel, message)
+
+    def deliver(self, channel: Any, message: Dict[str, Any]):
+        """Send to this process's subscribers only"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription._deliver(message)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+
+hub = Hub()
+
+
+class PostgresBridge:
+    """Relays hub publishes through LISTEN/NOTIFY on one PostgreSQL channel"""
+
+    def __init__(self, hub: Hub, engine, poll_timeout: float = 5.0):
+        self.hub = hub
+        self.engine = engine
+        self.poll_timeout = poll_timeout
+        self._thread = None
+
+    def notify(self, channel: Any, message: Dict[str, Any]):
+        self.notify_many([(channel, message)])
+
+    def notify_many(self, messages: List[Tuple[Any, Dict[str, Any]]]):
+        """NOTIFY every message with one statement on one pooled connection"""
+        payloads = [
+            json.dumps({'channel': channel, 'message': message}, separators=(',', ':'))
+            for channel, message in messages
+        ]
+        with self.engine.connect() as connection:
+            connection.execute(
+                text('SELECT pg_notify(:channel, payload) '
+                     'FROM unnest(CAST(:payloads AS text[])) WITH ORDINALITY AS p(payload, position) '
+                     'ORDER BY position'),
+                {'channel': NOTIFY_CHANNEL, 'payloads': payloads}
+            )
+            connection.commit()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='pubsub-listen', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception('LISTEN %s connection lost; reconnecting', NOTIFY_CHANNEL)
+                threading.Event().wait(self.poll_timeout)
+
+    def _listen(self):
+        raw = self.engine.raw_connection()
+        try:
+            connection = raw.driver_connection
+            connection.autocommit = True
+            connection.cursor().execute(f'LISTEN {NOTIFY_CHANNEL}')
+            while True:
+                if select.select([connection], [], [], self.poll_timeout) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notification = connection.notifies.pop(0)
+                    data = json.loads(notification.payload)
+                    self.hub.deliver(data['channel'], data['message'])
+        finally:
+            raw.invalidate()
+
+
+def init_pubsub(app):
+    """Start the LISTEN/NOTIFY bridge when enabled and running on PostgreSQL"""
+    if not app.config.get('PUBSUB_PG_NOTIFY') or hub.bridge is not None:
+        return
+    from app.extensions import db
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'postgresql':
+        logger.warning('PUBSUB_PG_NOTIFY needs PostgreSQL; using the in-process hub only')
+        return
+    hub.bridge = PostgresBridge(hub, engine)
+    hub.bridge.start()
+
+
+# ---------- Publish committed club events and follow changes ----------
+
+_PENDING_KEY = 'pubsub_club_events'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_club_events(session, flush_context):
+    # Snapshot now: attributes are expired, and can't be reloaded, once after_commit runs
+    for obj in session.new:
+        if isinstance(obj, ClubEvent):
+            session.info.setdefault(_PENDING_KEY, []).append((obj.bookclub_id, {
+                'id': obj.id,
+                'type': obj.event_type,
+                'data': obj.to_dict()
+            }))
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_club_events(session):
+    messages = list(session.info.pop(_PENDING_KEY, ()))
+    changes = session.info.pop(FOLLOW_CHANGES_KEY, None)
+    if changes:
+        messages.append((FOLLOW_CHANNEL, {'type': 'follow_changes', 'data': changes}))
+    try:
+        # One NOTIFY round trip per commit, however many events it made
+        hub.publish_many(messages)
+    except Exception:
+        # Streams catch up from club_events on reconnect and the social graph is
+        # rebuilt from follows periodically, so never fail the commit
+        logger.exception('Failed to publish %d messages', len(messages))
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_club_events(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(FOLLOW_CHANGES_KEY, None)
@@ -0,0 +1,201 @@
+"""Offline item-to-item "readers also liked" recommendations.
+
+A reader is linked to a book by reviewing it, or by belonging to a club
+whose ``current_book`` resolves to it through ``Book.normalized_key``. From
+the binary users x books matrix X, co-reader counts are C = X^T X and the
+similarity of two books is their cosine, C_ij / sqrt(n_i * n_j). Rows of C
+are computed a block at a time with sparse products, so memory stays
+bounded, and only the top K neighbours per book are kept.
+
+An incremental run only recomputes books whose neighbour lists can have
+changed since the previous run: books with new readers (reviews or
+memberships past the stored watermarks) and every book sharing a reader
+with one of them. Deleted reviews and changes to a club's current book are
+picked up by the next full build.
+
+NumPy and SciPy are only needed by the batch job, so they are imported
+lazily and the web app can run without them.
+"""
+from array import array
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, insert, select
+
+from app.extensions import db
+from app.models.book import Book
+from app.models.book_similarity import BookSimilarity
+from app.models.bookclub import BookClub
+from app.models.job_watermark import JobWatermark
+from app.models.membership import Membership
+from app.models.review import Review
+
+TOP_K = 20
+MIN_CO_READERS = 2
+BLOCK_SIZE = 512
+FETCH_SIZE = 10000
+WRITE_BATCH_SIZE = 5000
+
+REVIEWS_WATERMARK = 'book_similarities.reviews'
+MEMBERSHIPS_WATERMARK = 'book_similarities.memberships'
+
+
+def _club_books() -> Dict[int, int]:
+    """Map club id -> book id for clubs whose current book is in the catalog"""
+    club_keys = {}
+    for club_id, current_book in db.session.execute(
+        select(BookClub.id, BookClub.current_book).where(BookClub.current_book.isnot(None))
+    ):
+        if isinstance(current_book, dict) and current_book.get('title') and current_book.get('author'):
+            club_keys[club_id] = Book.duplicate_key(current_book['title'], current_book['author'])
+    if not club_keys:
+        return {}
+
+    book_by_key = {}
+    for book_id, key in db.session.execute(
+        select(Book.id, Book.normalized_key)
+        .where(Book.normalized_key.in_(set(club_keys.values())))
+        .order_by(Book.id)
+    ):
+        book_by_key.setdefault(key, book_id)
+    return {club_id: book_by_key[key] for club_id, key in club_keys.items() if key in book_by_key}
+
+
+def _load_reads(max_review_id: int, max_membership_id: int, club_books: Dict[int, int]):
+    """(user id, book id) arrays for every read up to the given row ids"""
+    users, books = array('q'), array('q')
+    for user_id, book_id in db.session.execute(
+        select(Review.user_id, Review.book_id)
+        .where(Review.id <= max_review_id)
+        .execution_options(yield_per=FETCH_SIZE)
+    ):
+        users.append(user_id)
+        books.append(book_id)
+
+    if club_books:
+        for user_id, club_id in db.session.execute(
+            select(Membership.user_id, Membership.bookclub_id)
+            .where(Membership.id <= max_membership_id, Membership.bookclub_id.in_(list(club_books)))
+            .execution_options(yield_per=FETCH_SIZE)
+        ):
+            users.append(user_id)
+            books.append(club_books[club_id])
+    return users, books
+
+
+def _new_reader_books(since_review_id: int, since_membership_id: int, max_review_id: int,
+                      max_membership_id: int, club_books: Dict[int, int]) -> set:
+    """Book ids that gained readers between the watermarks and the current max ids"""
+    touched = set(db.session.scalars(
+        select(Review.book_id).distinct()
+        .where(Review.id > since_review_id, Review.id <= max_review_id)
+    ))
+    if club_books:
+        for club_id in db.session.scalars(
+            select(Membership.bookclub_id).distinct()
+            .where(Membership.id > since_membership_id, Membership.id <= max_membership_id)
+        ):
+            if club_id in club_books:
+                touched.add(club_books[club_id])
+    return touched
+
+
+def _top_neighbours(X, rows, k: int, min_co_readers: int, block_size: int):
+    """Yield (row, neighbour columns, scores) for each requested row of X^T X"""
+    import numpy as np
+
+    readers = np.asarray(X.sum(axis=0)).ravel()
+    inv_norm = np.zeros_like(readers, dtype=np.float64)
+    np.divide(1.0, np.sqrt(readers), out=inv_norm, where=readers > 0)
+    Xt = X.T.tocsr()
+
+    for start in range(0, len(rows), block_size):
+        block_rows = rows[start:start + block_size]
+        co = (Xt[block_rows] @ X).tocsr()
+
+        row_of_entry = np.repeat(block_rows, np.diff(co.indptr))
+        keep = (co.data >= min_co_readers) & (co.indices != row_of_entry)
+        scores = co.data * inv_norm[row_of_entry] * inv_norm[co.indices]
+        scores[~keep] = 0
+
+        for i, row in enumerate(block_rows):
+            lo, hi = co.indptr[i], co.indptr[i + 1]
+            row_scores = scores[lo:hi]
+            candidates = np.flatnonzero(row_scores)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-row_scores[candidates], k - 1)[:k]]
+            order = candidates[np.lexsort((co.indices[lo:hi][candidates], -row_scores[candidates]))]
+            yield row, co.indices[lo:hi][order], row_scores[order]
+
+
+def build_similarities(incremental: bool = False, k: int = TOP_K, min_co_readers: int = MIN_CO_READERS,
+                       block_size: int = BLOCK_SIZE) -> Dict[str, Any]:
+    """Rebuild book_similarities (or only its stale rows) and commit.
+
+    Returns counts describing the run.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    max_review_id = db.session.scalar(select(func.coalesce(func.max(Review.id), 0)))
+    max_membership_id = db.session.scalar(select(func.coalesce(func.max(Membership.id), 0)))
+    since_review_id = JobWatermark.get(REVIEWS_WATERMARK)
+    since_membership_id = JobWatermark.get(MEMBERSHIPS_WATERMARK)
+    club_books = _club_books()
+
+    touched: Optional[set] = None
+    if incremental and (since_review_id or since_membership_id):
+        touched = _new_reader_books(
+            since_review_id, since_membership_id, max_review_id, max_membership_id, club_books
+        )
+        if not touched:
+            return {'mode': 'incremental', 'books_recomputed': 0, 'rows_written': 0}
+
+    users, books = _load_reads(max_review_id, max_membership_id, club_books)
+    users = np.frombuffer(users, dtype=np.int64)
+    books = np.frombuffer(books, dtype=np.int64)
+    _, user_index = np.unique(users, return_inverse=True)
+    book_ids, book_index = np.unique(books, return_inverse=True)
+
+    X = sparse.csr_matrix(
+        (np.ones(len(users), dtype=np.float32), (user_index, book_index)),
+        shape=(int(user_index.max()) + 1 if len(users) else 0, len(book_ids))
+    )
+    X.data[:] = 1  # Several reviews of one book by one reader still count once
+
+    if touched is None:
+        rows = np.arange(len(book_ids))
+        db.session.execute(delete(BookSimilarity))
+    else:
+        touched_mask = np.isin(book_ids, list(touched))
+        # Rows that can change: touched books and every book co-read with one
+        touched_readers = np.asarray(X[:, touched_mask].sum(axis=1)).ravel() > 0
+        rows = np.flatnonzero(np.asarray(X[touched_readers].sum(axis=0)).ravel() > 0)
+        stale = [int(book_id) for book_id in book_ids[rows]]
+        for start in range(0, len(stale), WRITE_BATCH_SIZE):
+            db.session.execute(
+                delete(BookSimilarity).where(BookSimilarity.book_id.in_(stale[start:start + WRITE_BATCH_SIZE]))
+            )
+
+    written, pending = 0, []
+    for row, neighbours, scores in _top_neighbours(X, rows, k, min_co_readers, block_size):
+        book_id = int(book_ids[row])
+        pending.extend(
+            {'book_id': book_id, 'rank': rank, 'similar_book_id': int(book_ids[column]), 'score': float(score)}
+            for rank, (column, score) in enumerate(zip(neighbours, scores), start=1)
+        )
+        if len(pending) >= WRITE_BATCH_SIZE:
+            db.session.execute(insert(BookSimilarity), pending)
+            written += len(pending)
+            pending = []
+    if pending:
+        db.session.execute(insert(BookSimilarity), pending)
+        written += len(pending)
+
+    JobWatermark.set(REVIEWS_WATERMARK, max_review_id)
+    JobWatermark.set(MEMBERSHIPS_WATERMARK, max_membership_id)
+    db.session.commit()
+    return {
+        'mode': 'full' if touched is None else 'incremental',
+        'books_recomputed': len(rows),
+        'rows_written': written
+    }
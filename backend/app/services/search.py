@@ -0,0 +1,240 @@
+"""Ranked full-text search over the book catalog.
+
+On PostgreSQL the search runs against the ``books.search_vector`` tsvector
+column, which a trigger keeps in sync (see the add_book_search_vector
+migration) and a GIN index makes fast. Other databases, i.e. SQLite in
+local test and benchmark runs, fall back to an in-process inverted index
+with the same API.
+"""
+import math
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.book import Book
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+SNIPPET_WORDS = 30
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_STOPWORDS = frozenset(
+    'a an and are as at be by for from has in is it its of on or that the to was were will with'.split()
+)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens with stopwords removed"""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+# ---------- In-memory indexes ----------
+
+class MemoryBookIndex:
+    """Base class for in-process indexes over the books table.
+
+    Indexes are built lazily on first use and then kept current from
+    committed ORM changes. Writes that bypass the ORM unit of work (bulk
+    inserts, raw SQL) must call ``invalidate_memory_indexes()``.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        memory_indexes.append(self)
+
+    def ensure_built(self):
+        with self._lock:
+            if not self._built:
+                self.clear()
+                rows = db.session.execute(
+                    select(Book.id, Book.title, Book.author, Book.synopsis)
+                ).yield_per(1000)
+                for row in rows:
+                    self.add(row.id, _document(row))
+                self._built = True
+
+    def apply(self, changes: Dict[int, Optional[Dict[str, Any]]]):
+        with self._lock:
+            if not self._built:
+                return
+            for book_id, doc in changes.items():
+                self.remove(book_id)
+                if doc is not None:
+                    self.add(book_id, doc)
+
+    def invalidate(self):
+        with self._lock:
+            self._built = False
+            self.clear()
+
+    def clear(self):
+        raise NotImplementedError
+
+    def add(self, book_id: int, doc: Dict[str, Any]):
+        raise NotImplementedError
+
+    def remove(self, book_id: int):
+        raise NotImplementedError
+
+
+memory_indexes: List[MemoryBookIndex] = []
+
+
+def invalidate_memory_indexes():
+    """Force every in-memory book index to rebuild on next use"""
+    for index in memory_indexes:
+        index.invalidate()
+
+
+def _document(book) -> Dict[str, Any]:
+    return {'title': book.title, 'author': book.author, 'synopsis': book.synopsis}
+
+
+_PENDING_KEY = 'memory_index_book_changes'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_book_changes(session, flush_context):
+    changes = None
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Book):
+            changes = changes if changes is not None else session.info.setdefault(_PENDING_KEY, {})
+            changes[obj.id] = _document(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Book):
+            changes = changes if changes is not None else session.info.setdefault(_PENDING_KEY, {})
+            changes[obj.id] = None
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_book_changes(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        for index in memory_indexes:
+            index.apply(changes)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_book_changes(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+class InvertedIndex(MemoryBookIndex):
+    """Weighted term-frequency inverted index used when tsvector is unavailable"""
+
+    FIELD_WEIGHTS = {'title': 3.0, 'author': 2.0, 'synopsis': 1.0}
+
+    def clear(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._docs: Dict[int, Dict[str, Any]] = {}
+
+    def add(self, book_id: int, doc: Dict[str, Any]):
+        weights: Dict[str, float] = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            for token in tokenize(doc.get(field)):
+                weights[token] = weights.get(token, 0.0) + weight
+        for token, weight in weights.items():
+            self._postings.setdefault(token, {})[book_id] = weight
+        self._docs[book_id] = doc
+
+    def remove(self, book_id: int):
+        doc = self._docs.pop(book_id, None)
+        if doc is None:
+            return
+        for field in self.FIELD_WEIGHTS:
+            for token in tokenize(doc.get(field)):
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(book_id, None)
+                    if not postings:
+                        del self._postings[token]
+
+    def search(self, query: str, offset: int, limit: int) -> List[Tuple[int, float, str]]:
+        """AND-match all query terms; returns (book_id, rank, snippet) tuples"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        self.ensure_built()
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for p in postings[1:]:
+                candidates &= p.keys()
+
+            total = len(self._docs)
+            scored = []
+            for book_id in candidates:
+                score = sum(p[book_id] * math.log(1 + total / len(p)) for p in postings)
+                scored.append((-score, book_id))
+            scored.sort()
+
+            return [
+                (book_id, -neg_score, highlight(self._docs[book_id], terms))
+                for neg_score, book_id in scored[offset:offset + limit]
+            ]
+
+
+def highlight(doc: Dict[str, Any], terms: Iterable[str]) -> str:
+    """Excerpt of the synopsis (or title) around the first match, with hits marked"""
+    terms = set(terms)
+    text = doc.get('synopsis') or doc.get('title') or ''
+    words = text.split()
+    first = next(
+        (i for i, w in enumerate(words) if any(t in terms for t in tokenize(w))),
+        0
+    )
+    start = max(0, first - SNIPPET_WORDS // 3)
+    excerpt = []
+    for word in words[start:start + SNIPPET_WORDS]:
+        if any(t in terms for t in tokenize(word)):
+            word = f'{HIGHLIGHT_START}{word}{HIGHLIGHT_STOP}'
+        excerpt.append(word)
+    return ' '.join(excerpt)
+
+
+book_index = InvertedIndex()
+
+
+# ---------- Search entry point ----------
+
+def _search_postgres(query: str, offset: int, limit: int) -> List[Tuple[int, float, str]]:
+    tsquery = func.websearch_to_tsquery('english', query)
+    rank = func.ts_rank_cd(Book.search_vector, tsquery)
+    # Rank and page first so ts_headline only runs on the returned rows
+    hits = (
+        select(Book.id.label('id'), rank.label('rank'))
+        .where(Book.search_vector.op('@@')(tsquery))
+        .order_by(rank.desc(), Book.id)
+        .offset(offset)
+        .limit(limit)
+        .subquery()
+    )
+    snippet = func.ts_headline(
+        'english',
+        func.coalesce(Book.synopsis, Book.title),
+        tsquery,
+        f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords={SNIPPET_WORDS}, MinWords=10'
+    )
+    rows = db.session.execute(
+        select(hits.c.id, hits.c.rank, snippet.label('snippet'))
+        .join(Book, Book.id == hits.c.id)
+        .order_by(hits.c.rank.desc(), hits.c.id)
+    )
+    return [(row.id, float(row.rank), row.snippet) for row in rows]
+
+
+def search_books(query: str, offset: int = 0, limit: int = 20) -> List[Tuple[int, float, str]]:
+    """Ranked (book_id, rank, snippet) hits for a free-text query"""
+    if db.engine.dialect.name == 'postgresql':
+        return _search_postgres(query, offset, limit)
+    return book_index.search(query, offset, limit)
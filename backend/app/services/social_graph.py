@@ -0,0 +1,237 @@
+"""In-memory follow graph behind "people you may know" suggestions.
+
+The follows table is loaded into two CSR adjacency structures, who each user
+follows and who follows them: an ``indptr`` array indexed by user id and a
+sorted int32 ``indices`` array, about 4 bytes per edge per direction.
+Neighbour lookups are array slices, so a friends-of-friends expansion over
+millions of edges takes milliseconds instead of a recursive SQL query.
+
+Follows and unfollows made after the load are kept as a small overlay of
+added and removed edges. User.adjust_follow_counts notes every change in the
+session and app.services.pubsub publishes it on FOLLOW_CHANNEL once it
+commits (through PostgreSQL NOTIFY when PUBSUB_PG_NOTIFY is set, so every
+worker sees it). Each graph drains its subscription before answering. The
+base arrays are rebuilt in the background every SOCIAL_GRAPH_MAX_AGE
+seconds, or as soon as the subscription overflows and changes were lost.
+
+NumPy is imported on first use, so the rest of the web app still runs
+without it; only the suggestion and mutual-follow endpoints need it.
+"""
+import logging
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Set
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models.membership import Membership
+from app.models.user import follows
+from app.services.pubsub import FOLLOW_CHANNEL, hub
+
+logger = logging.getLogger(__name__)
+
+FETCH_SIZE = 10000
+# Followees expanded per suggestion request
+MAX_EXPANSION = 1000
+# Score added per shared club; each mutual follow scores 1
+CLUB_BOOST = 2.0
+# Candidates, best by mutual count, looked up for shared clubs
+BOOST_CANDIDATES = 200
+
+
+class _Adjacency:
+    """One direction of the graph: CSR arrays plus an overlay of later changes"""
+
+    def __init__(self, sources: 'np.ndarray', targets: 'np.ndarray'):
+        import numpy as np
+        order = np.lexsort((targets, sources))
+        sources = sources[order]
+        self.indices = targets[order]
+        size = int(sources.max()) + 2 if len(sources) else 1
+        self.indptr = np.searchsorted(sources, np.arange(size))
+        self.added: Dict[int, Set[int]] = {}
+        self.removed: Dict[int, Set[int]] = {}
+
+    def _base(self, node: int) -> 'np.ndarray':
+        if not 0 <= node < len(self.indptr) - 1:
+            return self.indices[:0]
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def _in_base(self, node: int, other: int) -> bool:
+        import numpy as np
+        base = self._base(node)
+        position = np.searchsorted(base, other)
+        return position < len(base) and base[position] == other
+
+    def apply(self, node: int, other: int, delta: int):
+        # Idempotent, so changes already in the base arrays can be replayed safely
+        if delta > 0:
+            self.removed.get(node, set()).discard(other)
+            if not self._in_base(node, other):
+                self.added.setdefault(node, set()).add(other)
+        else:
+            self.added.get(node, set()).discard(other)
+            if self._in_base(node, other):
+                self.removed.setdefault(node, set()).add(other)
+
+    def neighbours(self, node: int) -> 'np.ndarray':
+        """Sorted ids adjacent to node"""
+        import numpy as np
+        result = self._base(node)
+        removed = self.removed.get(node)
+        if removed:
+            result = result[~np.isin(result, np.fromiter(removed, dtype=np.int32))]
+        added = self.added.get(node)
+        if added:
+            result = np.union1d(result, np.fromiter(added, dtype=np.int32))
+        return result
+
+
+class SocialGraph:
+    def __init__(self, app, max_age: float = 600.0):
+        self.app = app
+        self.max_age = max_age
+        self.built_at = 0.0
+        self._following = None
+        self._followers = None
+        self._subscription = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._rebuilding = False
+
+    def _load(self):
+        import numpy as np
+
+        # Subscribe first: anything committed during the load is then replayed, harmlessly
+        subscription = hub.subscribe(FOLLOW_CHANNEL)
+        follower_ids, followed_ids = array('i'), array('i')
+        with self.app.app_context():
+            try:
+                for follower_id, followed_id in db.session.execute(
+                    select(follows.c.follower_id, follows.c.followed_id).execution_options(yield_per=FETCH_SIZE)
+                ):
+                    follower_ids.append(follower_id)
+                    followed_ids.append(followed_id)
+            finally:
+                db.session.remove()
+
+        follower_ids = np.frombuffer(follower_ids, dtype=np.int32)
+        followed_ids = np.frombuffer(followed_ids, dtype=np.int32)
+        following = _Adjacency(follower_ids, followed_ids)
+        followers = _Adjacency(followed_ids, follower_ids)
+        with self._lock:
+            previous, self._subscription = self._subscription, subscription
+            self._following, self._followers = following, followers
+            self.built_at = time.monotonic()
+            self._rebuilding = False
+        if previous is not None:
+            previous.close()
+        logger.info('Loaded social graph with %d follows', len(follower_ids))
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self._load()
+            except Exception:
+                logger.exception('Social graph rebuild failed')
+                with self._lock:
+                    self._rebuilding = False
+
+        threading.Thread(target=run, name='social-graph-rebuild', daemon=True).start()
+
+    def _sync(self):
+        """Load on first use, then apply the follow changes published since the last call"""
+        if self._following is None:
+            with self._build_lock:
+                if self._following is None:
+                    self._load()
+
+        subscription = self._subscription
+        if subscription.overflowed or time.monotonic() - self.built_at > self.max_age:
+            self._rebuild_in_background()
+        while (message := subscription.get(timeout=0)) is not None:
+            with self._lock:
+                for follower_id, followed_id, delta in message['data']:
+                    self._following.apply(follower_id, followed_id, delta)
+                    self._followers.apply(followed_id, follower_id, delta)
+
+    def following(self, user_id: int) -> 'np.ndarray':
+        self._sync()
+        with self._lock:
+            return self._following.neighbours(user_id)
+
+    def followers(self, user_id: int) -> 'np.ndarray':
+        self._sync()
+        with self._lock:
+            return self._followers.neighbours(user_id)
+
+    def mutual(self, user_id: int, other_id: int) -> 'np.ndarray':
+        """Sorted ids of the users user_id follows who also follow other_id"""
+        import numpy as np
+        self._sync()
+        with self._lock:
+            return np.intersect1d(
+                self._following.neighbours(user_id), self._followers.neighbours(other_id), assume_unique=True
+            )
+
+    def friends_of_friends(self, user_id: int, limit: int) -> List[tuple]:
+        """(user id, mutual count) of users followed by user_id's followees, most mutuals first"""
+        import numpy as np
+        self._sync()
+        with self._lock:
+            mine = self._following.neighbours(user_id)
+            if not len(mine):
+                return []
+            reached = np.concatenate([self._following.neighbours(int(f)) for f in mine[:MAX_EXPANSION]])
+        ids, counts = np.unique(reached, return_counts=True)
+        keep = (ids != user_id) & ~np.isin(ids, mine, assume_unique=True)
+        ids, counts = ids[keep], counts[keep]
+        top = np.argsort(-counts, kind='stable')[:limit]
+        return list(zip(ids[top].tolist(), counts[top].tolist()))
+
+
+def suggest_users(graph: SocialGraph, user_id: int, limit: int) -> List[Dict[str, Any]]:
+    """Friends-of-friends ranked by mutual follows, boosted by clubs shared with user_id"""
+    candidates = graph.friends_of_friends(user_id, max(limit, BOOST_CANDIDATES))
+    if not candidates:
+        return []
+    candidate_ids = [candidate_id for candidate_id, _ in candidates]
+    shared = dict(db.session.execute(
+        select(Membership.user_id, func.count())
+        .where(
+            Membership.bookclub_id.in_(select(Membership.bookclub_id).where(Membership.user_id == user_id)),
+            Membership.user_id.in_(candidate_ids)
+        )
+        .group_by(Membership.user_id)
+    ).all())
+    ranked = [
+        {
+            'user_id': candidate_id,
+            'mutual_count': mutuals,
+            'shared_clubs': shared.get(candidate_id, 0),
+            'score': mutuals + CLUB_BOOST * shared.get(candidate_id, 0)
+        }
+        for candidate_id, mutuals in candidates
+    ]
+    ranked.sort(key=lambda suggestion: (-suggestion['score'], suggestion['user_id']))
+    return ranked[:limit]
+
+
+_create_lock = threading.Lock()
+
+
+def get_social_graph(app) -> SocialGraph:
+    """The application's SocialGraph, created (but not loaded) on first use"""
+    with _create_lock:
+        graph = app.extensions.get('social_graph')
+        if graph is None:
+            graph = SocialGraph(app, max_age=app.config.get('SOCIAL_GRAPH_MAX_AGE', 600))
+            app.extensions['social_graph'] = graph
+        return graph
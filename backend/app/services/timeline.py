@@ -0,0 +1,298 @@
+"""Home timeline: recent summaries and reviews by the users someone follows.
+
+Hybrid fan-out. When a summary or review is inserted by an author with at
+most FEED_FANOUT_MAX_FOLLOWERS followers, one INSERT ... SELECT copies a
+reference into every follower's timeline_entries, in the same transaction
+(fan-out on write). Items by authors above the threshold are not copied;
+readers who follow them fetch those authors' recent items directly (fan-out
+on read), so a single post never writes millions of rows.
+
+A feed page is a k-way merge of sorted streams under one keyset cursor,
+(created_at, item_type, item_id) descending: the reader's materialized
+timeline, plus one stream per pulled author and item type. Each stream
+fetches at most one page past the cursor. Timeline entries are joined to
+the current follows, so unfollowing hides an author at once; following
+someone shows their items from then on, or after `flask feed rebuild`.
+Deleting an item removes its copies (through the ORM here, or in bulk by
+app.services.club_deletion); feed_page skips any that slip through.
+"""
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import DateTime, Integer, String, and_, event, literal, select, tuple_, union_all
+
+from app.extensions import db
+from app.models.review import Review
+from app.models.summary import Summary
+from app.models.timeline_entry import TimelineEntry
+from app.models.user import User, follows
+from app.utils import decode_cursor, encode_cursor
+
+DEFAULT_FANOUT_MAX_FOLLOWERS = 5000
+# Pulled (high-follower) followees merged into one feed page
+MAX_PULLED_AUTHORS = 200
+# Extra reads feed_page makes to replace items deleted since they were fanned out,
+# each FILL_GROWTH times larger than the last
+MAX_FILL_ROUNDS = 3
+FILL_GROWTH = 4
+MAX_FILL_BATCH = 500
+
+ITEM_MODELS = {TimelineEntry.SUMMARY: Summary, TimelineEntry.REVIEW: Review}
+
+
+def fanout_max_followers() -> int:
+    if has_app_context():
+        return current_app.config.get('FEED_FANOUT_MAX_FOLLOWERS', DEFAULT_FANOUT_MAX_FOLLOWERS)
+    return DEFAULT_FANOUT_MAX_FOLLOWERS
+
+
+def fan_out(connection, item_type: str, item_id: int, author_id: int, created_at: datetime,
+            max_followers: Optional[int] = None) -> int:
+    """Copy one item into its author's followers' timelines.
+
+    Skipped for authors above max_followers, whose items are read on demand.
+    Returns the number of timeline rows written.
+    """
+    if max_followers is None:
+        max_followers = fanout_max_followers()
+    followers_count = connection.scalar(select(User.followers_count).where(User.id == author_id))
+    if not followers_count or followers_count > max_followers:
+        return 0
+
+    stmt = TimelineEntry.__table__.insert().from_select(
+        ['user_id', 'item_type', 'item_id', 'author_id', 'created_at'],
+        select(
+            follows.c.follower_id,
+            literal(item_type, String),
+            literal(item_id, Integer),
+            literal(author_id, Integer),
+            literal(created_at, DateTime)
+        ).where(follows.c.followed_id == author_id)
+    )
+    return connection.execute(stmt).rowcount
+
+
+def _fan_out_listener(item_type: str):
+    def listener(mapper, connection, target):
+        fan_out(connection, item_type, target.id, target.user_id, target.created_at or datetime.utcnow())
+    return listener
+
+
+def _retract_listener(item_type: str):
+    def listener(mapper, connection, target):
+        connection.execute(
+            TimelineEntry.__table__.delete().where(
+                TimelineEntry.item_type == item_type, TimelineEntry.item_id == target.id
+            )
+        )
+    return listener
+
+
+for _item_type, _model in ITEM_MODELS.items():
+    event.listen(_model, 'after_insert', _fan_out_listener(_item_type))
+    event.listen(_model, 'after_delete', _retract_listener(_item_type))
+
+
+def _after_key(created_at, item_type: str, item_id: int, key: Optional[tuple]):
+    """Keyset condition for a stream whose rows all share item_type"""
+    if key is None:
+        return None
+    after_created_at, after_type, after_id = key
+    if item_type < after_type:
+        return created_at <= after_created_at
+    if item_type > after_type:
+        return created_at < after_created_at
+    return tuple_(created_at, item_id) < (after_created_at, after_id)
+
+
+def _timeline_stream(user_id: int, limit: int, key: Optional[tuple]) -> List[tuple]:
+    entry = TimelineEntry
+    query = (
+        select(entry.created_at, entry.item_type, entry.item_id, entry.author_id)
+        .join(follows, and_(follows.c.follower_id == entry.user_id, follows.c.followed_id == entry.author_id))
+        .where(entry.user_id == user_id)
+    )
+    if key is not None:
+        query = query.where(tuple_(entry.created_at, entry.item_type, entry.item_id) < key)
+    query = query.order_by(entry.created_at.desc(), entry.item_type.desc(), entry.item_id.desc()).limit(limit)
+    return [tuple(row) for row in db.session.execute(query)]
+
+
+def _pulled_streams(author_ids: List[int], limit: int, key: Optional[tuple]) -> List[List[tuple]]:
+    """Newest items past the cursor for each author and item type, in one round trip"""
+    branches = []
+    for author_id in author_ids:
+        for item_type, model in ITEM_MODELS.items():
+            query = select(
+                literal(len(branches), Integer).label('stream'),
+                model.created_at.label('created_at'),
+                literal(item_type, String).label('item_type'),
+                model.id.label('item_id'),
+                model.user_id.label('author_id')
+            ).where(model.user_id == author_id, model.created_at.isnot(None))
+            condition = _after_key(model.created_at, item_type, model.id, key)
+            if condition is not None:
+                query = query.where(condition)
+            # Wrapped so each branch keeps its own ORDER BY/LIMIT inside the UNION
+            branches.append(select(query.order_by(model.created_at.desc(), model.id.desc()).limit(limit).subquery()))
+
+    streams: List[List[tuple]] = [[] for _ in branches]
+    if not branches:
+        return streams
+    combined = union_all(*branches).subquery()
+    rows = db.session.execute(
+        select(combined).order_by(combined.c.stream, combined.c.created_at.desc(), combined.c.item_id.desc())
+    )
+    for stream, created_at, item_type, item_id, author_id in rows:
+        streams[stream].append((created_at, item_type, item_id, author_id))
+    return streams
+
+
+def _parse_cursor(after: str) -> tuple:
+    try:
+        created_at, item_type, item_id = decode_cursor(after)
+        return datetime.fromisoformat(created_at), str(item_type), int(item_id)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def read_feed(user_id: int, limit: int, after: Optional[str] = None,
+              max_followers: Optional[int] = None) -> Tuple[List[tuple], Optional[str]]:
+    """One page of user_id's home timeline, newest first.
+
+    Returns (created_at, item_type, item_id, author_id) keys and the next
+    page's cursor, if any. Raises ValueError for a malformed cursor.
+    """
+    if max_followers is None:
+        max_followers = fanout_max_followers()
+    key = _parse_cursor(after) if after else None
+
+    pulled = db.session.scalars(
+        select(follows.c.followed_id)
+        .join(User, User.id == follows.c.followed_id)
+        .where(follows.c.follower_id == user_id, User.followers_count > max_followers)
+        .order_by(User.followers_count.desc())
+        .limit(MAX_PULLED_AUTHORS)
+    ).all()
+
+    streams = [_timeline_stream(user_id, limit + 1, key)]
+    streams.extend(_pulled_streams(pulled, limit + 1, key))
+
+    page, seen = [], set()
+    # An author can cross the threshold, leaving an item both materialized and pulled
+    for row in heapq.merge(*streams, key=lambda row: row[:3], reverse=True):
+        if row[1:3] in seen:
+            continue
+        seen.add(row[1:3])
+        page.append(row)
+        if len(page) > limit:
+            break
+
+    has_more = len(page) > limit
+    page = page[:limit]
+    return page, encode_cursor(*page[-1][:3]) if has_more else None
+
+
+def hydrate(keys: List[tuple]) -> List[Dict[str, Any]]:
+    """Feed items for keys from read_feed; items deleted meanwhile are dropped"""
+    ids_by_type: Dict[str, List[int]] = {}
+    for _, item_type, item_id, _ in keys:
+        ids_by_type.setdefault(item_type, []).append(item_id)
+
+    items_by_key = {}
+    for item_type, ids in ids_by_type.items():
+        model = ITEM_MODELS[item_type]
+        for item in db.session.scalars(select(model).where(model.id.in_(ids))):
+            items_by_key[(item_type, item.id)] = item
+
+    author_ids = {author_id for *_, author_id in keys}
+    authors = {
+        author.id: author
+        for author in db.session.scalars(select(User).where(User.id.in_(author_ids)))
+    } if author_ids else {}
+
+    results = []
+    for created_at, item_type, item_id, author_id in keys:
+        item = items_by_key.get((item_type, item_id))
+        if item is None:
+            continue
+        author = authors.get(author_id)
+        entry = {
+            'type': item_type,
+            'id': item_id,
+            'created_at': created_at.isoformat(),
+            'content': item.content,
+            'author': {
+                'id': author_id,
+                'username': author.username if author else None,
+                'avatar_url': author.avatar_url if author else None
+            }
+        }
+        if item_type == TimelineEntry.SUMMARY:
+            entry['bookclub_id'] = item.bookclub_id
+        else:
+            entry['book_id'] = item.book_id
+            entry['rating'] = item.rating
+        results.append(entry)
+    return results
+
+
+def feed_page(user_id: int, limit: int, after: Optional[str] = None,
+              max_followers: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Up to limit hydrated feed items and the next page's cursor.
+
+    Keys whose item no longer exists are skipped and the page is topped up
+    from further along the feed, reading more keys each round. Raises
+    ValueError for a malformed cursor.
+    """
+    items, cursor = [], after
+    for round_number in range(1 + MAX_FILL_ROUNDS):
+        batch = min((limit - len(items)) * FILL_GROWTH ** round_number, MAX_FILL_BATCH)
+        keys, cursor = read_feed(user_id, batch, after=cursor, max_followers=max_followers)
+        items.extend(hydrate(keys))
+        if cursor is None or len(items) >= limit:
+            break
+
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        cursor = encode_cursor(last['created_at'], last['type'], last['id'])
+    return items, cursor
+
+
+def rebuild_timelines(days: int, max_followers: Optional[int] = None) -> int:
+    """Re-materialize the last `days` of items for every fanned-out author.
+
+    Fills in items from before a follow, or from before an author dropped
+    below the threshold. Returns the number of timeline rows written.
+    """
+    if max_followers is None:
+        max_followers = fanout_max_followers()
+    since = datetime.utcnow() - timedelta(days=days)
+    written = 0
+    for item_type, model in ITEM_MODELS.items():
+        source = (
+            select(
+                follows.c.follower_id,
+                literal(item_type, String),
+                model.id,
+                model.user_id,
+                model.created_at
+            )
+            .join(model, model.user_id == follows.c.followed_id)
+            .join(User, User.id == model.user_id)
+            .where(model.created_at >= since, User.followers_count <= max_followers)
+            .where(~select(TimelineEntry.user_id).where(
+                TimelineEntry.user_id == follows.c.follower_id,
+                TimelineEntry.item_type == item_type,
+                TimelineEntry.item_id == model.id
+            ).exists())
+        )
+        written += db.session.execute(
+            TimelineEntry.__table__.insert().from_select(
+                ['user_id', 'item_type', 'item_id', 'author_id', 'created_at'], source
+            )
+        ).rowcount
+    return written
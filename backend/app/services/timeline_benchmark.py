@@ -0,0 +1,115 @@
+"""Synthetic load for the home feed, behind `flask feed benchmark`.
+
+Builds users, follows and posts inside one transaction, measures what the
+hybrid fan-out costs on write (timeline rows and time per post) and on read
+(time per feed page), then rolls everything back.
+"""
+import random
+import secrets
+import statistics
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models.summary import Summary
+from app.models.timeline_entry import TimelineEntry
+from app.models.user import User, follows
+from app.services.timeline import feed_page
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'p50_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3)
+    }
+
+
+def run_benchmark(users: int, follows_per_user: int, celebrities: int, posts: int, reads: int,
+                  limit: int, max_followers: int, seed: int = 0) -> Dict[str, Any]:
+    """Measure write amplification and feed read latency; leaves the database unchanged"""
+    rng = random.Random(seed)
+    tag = secrets.token_hex(4)
+    config = current_app.config
+    previous_threshold = config.get('FEED_FANOUT_MAX_FOLLOWERS')
+    config['FEED_FANOUT_MAX_FOLLOWERS'] = max_followers
+    try:
+        now = datetime.utcnow()
+        db.session.execute(User.__table__.insert(), [
+            {'username': f'feedbench-{tag}-{i}', 'email': f'feedbench-{tag}-{i}@example.com',
+             'password_hash': '!', 'is_active': True, 'is_admin': False, 'created_at': now, 'updated_at': now}
+            for i in range(users)
+        ])
+        user_ids = db.session.scalars(
+            select(User.id).where(User.username.like(f'feedbench-{tag}-%')).order_by(User.id)
+        ).all()
+        celebrity_ids, regular_ids = user_ids[:celebrities], user_ids[celebrities:]
+
+        edges = set()
+        for follower_id in user_ids:
+            for followed_id in celebrity_ids:
+                edges.add((follower_id, followed_id))
+            for followed_id in rng.sample(regular_ids, min(follows_per_user, len(regular_ids))):
+                edges.add((follower_id, followed_id))
+        edges = [edge for edge in edges if edge[0] != edge[1]]
+        db.session.execute(follows.insert(), [
+            {'follower_id': follower_id, 'followed_id': followed_id, 'created_at': now}
+            for follower_id, followed_id in edges
+        ])
+        db.session.execute(
+            User.__table__.update().where(User.id.in_(user_ids)).values(
+                followers_count=select(func.count()).select_from(follows)
+                .where(follows.c.followed_id == User.id).scalar_subquery(),
+                following_count=select(func.count()).select_from(follows)
+                .where(follows.c.follower_id == User.id).scalar_subquery()
+            )
+        )
+        db.session.flush()
+
+        # Writes: one in ten posts by a high-follower account
+        timeline_rows_before = db.session.scalar(select(func.count()).select_from(TimelineEntry))
+        write_times = []
+        for i in range(posts):
+            pool = celebrity_ids if celebrity_ids and rng.random() < 0.1 else regular_ids
+            summary = Summary(content=f'Benchmark post {i}', user_id=rng.choice(pool))
+            summary.created_at = now - timedelta(seconds=rng.randrange(7 * 24 * 3600))
+            started = time.perf_counter()
+            db.session.add(summary)
+            db.session.flush()
+            write_times.append(time.perf_counter() - started)
+        timeline_rows = db.session.scalar(select(func.count()).select_from(TimelineEntry)) - timeline_rows_before
+
+        # Reads: a first page and the page after it for a sample of readers
+        first_page_times, next_page_times = [], []
+        for reader_id in rng.sample(user_ids, min(reads, len(user_ids))):
+            started = time.perf_counter()
+            _, cursor = feed_page(reader_id, limit, max_followers=max_followers)
+            first_page_times.append(time.perf_counter() - started)
+            if cursor:
+                started = time.perf_counter()
+                feed_page(reader_id, limit, after=cursor, max_followers=max_followers)
+                next_page_times.append(time.perf_counter() - started)
+
+        return {
+            'users': len(user_ids),
+            'follows': len(edges),
+            'pulled_authors': sum(1 for count in Counter(followed_id for _, followed_id in edges).values()
+                                  if count > max_followers),
+            'posts': posts,
+            'timeline_rows': timeline_rows,
+            'rows_per_post': round(timeline_rows / posts, 2) if posts else 0,
+            'write': _percentiles(write_times) if write_times else {},
+            'first_page': _percentiles(first_page_times) if first_page_times else {},
+            'next_page': _percentiles(next_page_times) if next_page_times else {}
+        }
+    finally:
+        db.session.rollback()
+        if previous_threshold is None:
+            config.pop('FEED_FANOUT_MAX_FOLLOWERS', None)
+        else:
+            config['FEED_FANOUT_MAX_FOLLOWERS'] = previous_threshold
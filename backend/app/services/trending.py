@@ -0,0 +1,134 @@
+"""Trending clubs: activity scores with exponential time decay.
+
+A club's score at time t is sum(w * exp(-decay * (t - t_e))) over its joins,
+summaries and scheduled meetings, with decay = ln 2 / half-life. Stored
+as-is, every score would have to be rewritten as time passes. Instead each
+club keeps
+
+    log_score = log(sum(w * exp(decay * (t_e - EPOCH))))
+
+which only changes when new events arrive; ``flask clubs update-trending``
+folds them in with logaddexp. Every club decays by the same factor
+exp(-decay * (t - EPOCH)), so ordering by log_score is the trending order
+at any moment, and the current score is exp(log_score - decay * (t - EPOCH)).
+Staying in logs keeps exp() from overflowing however far t is from EPOCH.
+
+Each worker holds the top TOP_N rows in memory for TOP_N_TTL seconds, so a
+page of /bookclubs/trending is a list slice plus one lookup of its clubs.
+"""
+import math
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, func, select
+
+from app.extensions import db
+from app.models.club_event import ClubEvent
+from app.models.club_trending_score import ClubTrendingScore
+from app.models.job_watermark import JobWatermark
+from app.services.cache import TTLCache
+from app.utils import dialect_insert
+
+EPOCH = datetime(2024, 1, 1)
+EVENTS_WATERMARK = 'club_trending.club_events'
+
+EVENT_WEIGHTS = {
+    ClubEvent.MEMBER_JOINED: 1.0,
+    ClubEvent.MEETING_SCHEDULED: 2.0,
+    ClubEvent.SUMMARY_POSTED: 3.0,
+}
+
+TOP_N = 500
+TOP_N_TTL = 60
+FETCH_SIZE = 10000
+WRITE_BATCH_SIZE = 5000
+# Clubs whose score has decayed below this drop out of the table
+MIN_SCORE = 0.01
+
+top_cache = TTLCache(ttl=TOP_N_TTL, maxsize=1)
+
+
+def decay_rate(half_life_hours: float) -> float:
+    """Per-second decay constant for a half-life given in hours"""
+    return math.log(2) / (half_life_hours * 3600)
+
+
+def _logaddexp(a: float, b: float) -> float:
+    if a < b:
+        a, b = b, a
+    return a + math.log1p(math.exp(b - a))
+
+
+def _log_offset(at: datetime, decay: float) -> float:
+    return decay * (at - EPOCH).total_seconds()
+
+
+def current_score(log_score: float, decay: float, now: datetime = None) -> float:
+    """The decayed score of a stored log_score at now"""
+    return math.exp(log_score - _log_offset(now or datetime.utcnow(), decay))
+
+
+def update_trending(half_life_hours: float, full: bool = False) -> Dict[str, int]:
+    """Fold club events past the watermark into club_trending_scores and commit.
+
+    With full=True every event is replayed into an empty table. Returns
+    counts describing the run.
+    """
+    decay = decay_rate(half_life_hours)
+    now = datetime.utcnow()
+    if full:
+        db.session.execute(delete(ClubTrendingScore))
+    since_id = 0 if full else JobWatermark.get(EVENTS_WATERMARK)
+    max_id = db.session.scalar(select(func.coalesce(func.max(ClubEvent.id), 0)))
+
+    added: Dict[int, float] = {}
+    events = 0
+    for club_id, event_type, created_at in db.session.execute(
+        select(ClubEvent.bookclub_id, ClubEvent.event_type, ClubEvent.created_at)
+        .where(ClubEvent.id > since_id, ClubEvent.id <= max_id, ClubEvent.event_type.in_(EVENT_WEIGHTS))
+        .execution_options(yield_per=FETCH_SIZE)
+    ):
+        term = math.log(EVENT_WEIGHTS[event_type]) + _log_offset(created_at, decay)
+        added[club_id] = _logaddexp(added[club_id], term) if club_id in added else term
+        events += 1
+
+    club_ids = list(added)
+    table = ClubTrendingScore.__table__
+    for start in range(0, len(club_ids), WRITE_BATCH_SIZE):
+        batch = club_ids[start:start + WRITE_BATCH_SIZE]
+        stored = dict(db.session.execute(
+            select(table.c.bookclub_id, table.c.log_score).where(table.c.bookclub_id.in_(batch))
+        ).all())
+        rows = [
+            {
+                'bookclub_id': club_id,
+                'log_score': _logaddexp(stored[club_id], added[club_id]) if club_id in stored else added[club_id],
+                'updated_at': now
+            }
+            for club_id in batch
+        ]
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.bookclub_id],
+            set_={'log_score': stmt.excluded.log_score, 'updated_at': stmt.excluded.updated_at}
+        )
+        db.session.execute(stmt, rows)
+
+    pruned = db.session.execute(
+        delete(table).where(table.c.log_score < math.log(MIN_SCORE) + _log_offset(now, decay))
+    ).rowcount
+
+    JobWatermark.set(EVENTS_WATERMARK, max_id)
+    db.session.commit()
+    return {'events': events, 'clubs_updated': len(club_ids), 'clubs_pruned': pruned}
+
+
+def top_clubs() -> List[Tuple[int, float]]:
+    """(club id, log_score) of the TOP_N trending clubs, best first"""
+    return top_cache.get_or_set('top', lambda: [
+        tuple(row) for row in db.session.execute(
+            select(ClubTrendingScore.bookclub_id, ClubTrendingScore.log_score)
+            .order_by(ClubTrendingScore.log_score.desc(), ClubTrendingScore.bookclub_id)
+            .limit(TOP_N)
+        )
+    ])
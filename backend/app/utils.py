@@ -1,8 +1,12 @@
 import re
+import json
+import base64
 from functools import wraps
 from flask import request, jsonify, current_app
 from itsdangerous import URLSafeTimedSerializer
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.dialects import postgresql, sqlite
+from app.extensions import db
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,6 +32,120 @@ def validate_username(username: str) -> bool:
     pattern = r'^[a-zA-Z0-9_]{3,50}$'
     return re.match(pattern, username) is not None
 
+
+# Keyset Pagination Helpers
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor"""
+    payload = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+def parse_limit(value, default: int = 20, maximum: int = 100) -> int:
+    """Parse a page size argument, clamping it to [1, maximum]"""
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, maximum))
+
+def follow_list_response(user, direction: str, serialize) -> dict:
+    """Response body for a page of user's 'followers' or 'following'.
+
+    Keyset-paginated when `limit` or `after` is given; otherwise the legacy
+    `page`/`per_page` shape. Totals come from the user's counter columns, so
+    no page costs a COUNT(*). Raises ValueError for bad query parameters.
+    """
+    total = user.followers_count if direction == 'followers' else user.following_count
+    if 'limit' in request.args or 'after' in request.args:
+        limit = parse_limit(request.args.get('limit'))
+        rows, next_cursor = user.follow_page(direction, limit, after=request.args.get('after'))
+        return {
+            direction: [serialize(other) for other, _ in rows],
+            'next_cursor': next_cursor,
+            'limit': limit,
+            'total': total
+        }
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = parse_limit(request.args.get('per_page'), default=10)
+    rows, _ = user.follow_page(direction, per_page, offset=(page - 1) * per_page)
+    return {
+        direction: [serialize(other) for other, _ in rows],
+        'total': total,
+        'pages': -(-total // per_page),
+        'current_page': page
+    }
+
+def contains_pattern(text: str) -> str:
+    """LIKE/ILIKE pattern matching text anywhere; use with escape='\\'"""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+# Database Helpers
+def dialect_insert(table):
+    """INSERT construct with on_conflict_* support for the active database"""
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+# Conditional GET Helpers
+def resource_etag(kind: str, resource_id, version: datetime) -> str:
+    """Opaque validator for one version of a resource"""
+    return f'{kind}-{resource_id}-{version.strftime("%Y%m%d%H%M%S%f")}'
+
+def not_modified(etag: str, last_modified: datetime, max_age: int = None):
+    """A 304 response if the request's validators match, else None.
+
+    Call this with values from a cheap column-only query, before loading or
+    serializing the resource. If-None-Match takes precedence over
+    If-Modified-Since, as RFC 9110 requires.
+    """
+    last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since:
+        matched = last_modified <= request.if_modified_since
+    else:
+        matched = False
+    if not matched:
+        return None
+    response = current_app.response_class(status=304)
+    add_validators(response, etag, last_modified, max_age)
+    return response
+
+def add_validators(response, etag: str, last_modified: datetime, max_age: int = None):
+    """Attach ETag/Last-Modified and ask clients to revalidate before reuse.
+
+    With max_age, shared caches may instead reuse the response for that many
+    seconds; for data that only changes when a batch job runs.
+    """
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    if max_age is None:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+
 # Invite Token Functions (keep these at the bottom)
 def invite_token_required(f):
     """Decorator for verifying invite tokens"""
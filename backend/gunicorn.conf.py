@@ -0,0 +1,23 @@
+"""Gunicorn settings, picked up automatically by `gunicorn app:app` run from backend/.
+
+gevent workers serve each request in a greenlet, so the long-lived
+/bookclubs/<id>/stream connections sit idle on a queue instead of holding
+an OS thread each.
+"""
+import os
+
+bind = f":{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+# Concurrent connections per gevent worker, open SSE streams included
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 2000))
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    # Let psycopg2 yield to other greenlets while waiting on PostgreSQL
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
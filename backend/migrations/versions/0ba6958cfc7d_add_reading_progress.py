@@ -0,0 +1,33 @@
+"""Add reading_progress table
+
+Revision ID: 0ba6958cfc7d
+Revises: 8d88515feb3e
+Create Date: 2026-10-18 15:46:02.913377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0ba6958cfc7d'
+down_revision = '8d88515feb3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reading_progress',
+    sa.Column('bookclub_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('pages_read', sa.Integer(), nullable=True),
+    sa.Column('percent', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['bookclub_id'], ['bookclubs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bookclub_id', 'user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('reading_progress')
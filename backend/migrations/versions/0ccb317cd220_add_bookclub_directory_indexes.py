@@ -0,0 +1,72 @@
+"""Add bookclubs.last_activity_at and club directory indexes
+
+Revision ID: 0ccb317cd220
+Revises: 6cc3ce17216b
+Create Date: 2026-10-18 14:52:19.307741
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0ccb317cd220'
+down_revision = '6cc3ce17216b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    op.add_column('bookclubs', sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE bookclubs SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+
+    # Latest of creation, last join, last summary and last meeting
+    op.execute("""
+        UPDATE bookclubs
+        SET last_activity_at = (
+            SELECT MAX(activity_at) FROM (
+                SELECT bookclubs.created_at AS activity_at
+                UNION ALL
+                SELECT MAX(joined_at) FROM memberships WHERE memberships.bookclub_id = bookclubs.id
+                UNION ALL
+                SELECT MAX(created_at) FROM summaries WHERE summaries.bookclub_id = bookclubs.id
+                UNION ALL
+                SELECT MAX(created_at) FROM meetings WHERE meetings.bookclub_id = bookclubs.id
+            ) AS activity
+        )
+    """)
+
+    with op.batch_alter_table('bookclubs', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.alter_column('last_activity_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_bookclubs_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_bookclubs_member_count_id', ['member_count', 'id'], unique=False)
+        batch_op.create_index('ix_bookclubs_last_activity_at_id', ['last_activity_at', 'id'], unique=False)
+        batch_op.create_index('ix_bookclubs_status', ['status'], unique=False)
+
+    if bind.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_bookclubs_name_trgm', 'bookclubs', ['name'], unique=False,
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+        )
+        op.create_index(
+            'ix_bookclubs_synopsis_trgm', 'bookclubs', ['synopsis'], unique=False,
+            postgresql_using='gin', postgresql_ops={'synopsis': 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_bookclubs_synopsis_trgm', table_name='bookclubs')
+        op.drop_index('ix_bookclubs_name_trgm', table_name='bookclubs')
+
+    with op.batch_alter_table('bookclubs', schema=None) as batch_op:
+        batch_op.drop_index('ix_bookclubs_status')
+        batch_op.drop_index('ix_bookclubs_last_activity_at_id')
+        batch_op.drop_index('ix_bookclubs_member_count_id')
+        batch_op.drop_index('ix_bookclubs_created_at_id')
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+        batch_op.drop_column('last_activity_at')
@@ -0,0 +1,36 @@
+"""Add club_daily_stats rollup table
+
+Revision ID: 18810a54b819
+Revises: d3afacf1022f
+Create Date: 2026-10-18 17:26:06.143737
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '18810a54b819'
+down_revision = 'd3afacf1022f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by `flask clubs refresh-stats --full`
+    op.create_table('club_daily_stats',
+    sa.Column('bookclub_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('members_joined', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('members_left', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('summaries_posted', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('meetings_held', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('pages_read', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['bookclub_id'], ['bookclubs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bookclub_id', 'day')
+    )
+
+
+def downgrade():
+    op.drop_table('club_daily_stats')
@@ -0,0 +1,40 @@
+"""Add book_similarities and job_watermarks tables
+
+Revision ID: 18f32355c05a
+Revises: ed79224ffa97
+Create Date: 2026-10-18 13:24:52.118406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '18f32355c05a'
+down_revision = 'ed79224ffa97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('book_similarities',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), nullable=False),
+    sa.Column('similar_book_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['similar_book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('book_id', 'rank')
+    )
+    op.create_table('job_watermarks',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Table starts empty; populate with `flask books build-similar`
+
+
+def downgrade():
+    op.drop_table('job_watermarks')
+    op.drop_table('book_similarities')
@@ -0,0 +1,53 @@
+"""Add timeline_entries and author recency indexes for the home feed
+
+Revision ID: 36b3a6608d97
+Revises: 690da9edd871
+Create Date: 2026-10-18 17:41:12.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '36b3a6608d97'
+down_revision = '690da9edd871'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Populate recent items afterwards with `flask feed rebuild`
+    op.create_table('timeline_entries',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('item_type', sa.String(length=10), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'item_type', 'item_id')
+    )
+    with op.batch_alter_table('timeline_entries', schema=None) as batch_op:
+        batch_op.create_index('ix_timeline_entries_user_id_created_at',
+                              ['user_id', 'created_at', 'item_type', 'item_id'], unique=False)
+        batch_op.create_index('ix_timeline_entries_item_type_item_id', ['item_type', 'item_id'], unique=False)
+
+    with op.batch_alter_table('summaries', schema=None) as batch_op:
+        batch_op.create_index('ix_summaries_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.create_index('ix_reviews_user_id_created_at_id', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_reviews_user_id_created_at_id')
+
+    with op.batch_alter_table('summaries', schema=None) as batch_op:
+        batch_op.drop_index('ix_summaries_user_id_created_at_id')
+
+    with op.batch_alter_table('timeline_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_timeline_entries_item_type_item_id')
+        batch_op.drop_index('ix_timeline_entries_user_id_created_at')
+
+    op.drop_table('timeline_entries')
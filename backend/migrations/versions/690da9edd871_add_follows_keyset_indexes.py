@@ -0,0 +1,43 @@
+"""Add follows keyset pagination indexes
+
+Revision ID: 690da9edd871
+Revises: f4251231f5a2
+Create Date: 2026-10-18 17:32:44.690690
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '690da9edd871'
+down_revision = 'f4251231f5a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset cursors need a sort key on every row; a follow can't predate either account
+    op.execute("""
+        UPDATE follows
+        SET created_at = (
+            SELECT MAX(users.created_at) FROM users
+            WHERE users.id IN (follows.follower_id, follows.followed_id)
+        )
+        WHERE created_at IS NULL
+    """)
+    op.execute("UPDATE follows SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+
+    with op.batch_alter_table('follows', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_follows_followed_id_created_at_follower_id',
+                              ['followed_id', 'created_at', 'follower_id'], unique=False)
+        batch_op.create_index('ix_follows_follower_id_created_at_followed_id',
+                              ['follower_id', 'created_at', 'followed_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('follows', schema=None) as batch_op:
+        batch_op.drop_index('ix_follows_follower_id_created_at_followed_id')
+        batch_op.drop_index('ix_follows_followed_id_created_at_follower_id')
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,35 @@
+"""Add counter-cached users.followers_count and following_count
+
+Revision ID: 6c38d8f472be
+Revises: ca20b352d4e9
+Create Date: 2026-10-18 17:28:30.950776
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c38d8f472be'
+down_revision = 'ca20b352d4e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('following_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Seed from existing rows; `flask users reconcile-follow-counts` repeats this
+    op.execute("""
+        UPDATE users
+        SET followers_count = (SELECT COUNT(*) FROM follows WHERE follows.followed_id = users.id),
+            following_count = (SELECT COUNT(*) FROM follows WHERE follows.follower_id = users.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('following_count')
+        batch_op.drop_column('followers_count')
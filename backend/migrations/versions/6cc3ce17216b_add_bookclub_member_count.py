@@ -0,0 +1,32 @@
+"""Add denormalized bookclubs.member_count
+
+Revision ID: 6cc3ce17216b
+Revises: 8fa29f4b1a95
+Create Date: 2026-10-18 14:21:40.885013
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6cc3ce17216b'
+down_revision = '8fa29f4b1a95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('bookclubs', sa.Column('member_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Seed from existing rows; `flask clubs reconcile-member-counts` repeats this
+    op.execute("""
+        UPDATE bookclubs
+        SET member_count = (
+            SELECT COUNT(*) FROM memberships WHERE memberships.bookclub_id = bookclubs.id
+        )
+    """)
+
+
+def downgrade():
+    op.drop_column('bookclubs', 'member_count')
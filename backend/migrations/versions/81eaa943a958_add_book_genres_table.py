@@ -0,0 +1,44 @@
+"""Add book_genres table
+
+Revision ID: 81eaa943a958
+Revises: bd29c7753c30
+Create Date: 2026-10-18 10:21:55.904317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '81eaa943a958'
+down_revision = 'bd29c7753c30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    book_genres = op.create_table('book_genres',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('genre', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('book_id', 'genre')
+    )
+    op.create_index('ix_book_genres_genre_book_id', 'book_genres', ['genre', 'book_id'], unique=False)
+
+    # Backfill from the existing JSON column
+    books = sa.table('books', sa.column('id', sa.Integer), sa.column('genres', sa.JSON))
+    rows = []
+    for book_id, genres in op.get_bind().execute(sa.select(books.c.id, books.c.genres)):
+        seen = set()
+        for genre in genres or []:
+            name = ' '.join(str(genre).split())[:50]
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                rows.append({'book_id': book_id, 'genre': name})
+    if rows:
+        op.bulk_insert(book_genres, rows)
+
+
+def downgrade():
+    op.drop_index('ix_book_genres_genre_book_id', table_name='book_genres')
+    op.drop_table('book_genres')
@@ -0,0 +1,28 @@
+"""Add membership roster indexes
+
+Revision ID: 8d88515feb3e
+Revises: 0ccb317cd220
+Create Date: 2026-10-18 15:17:33.560218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d88515feb3e'
+down_revision = '0ccb317cd220'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('memberships', schema=None) as batch_op:
+        batch_op.create_index('ix_memberships_bookclub_id_id', ['bookclub_id', 'id'], unique=False)
+        batch_op.create_index('ix_memberships_bookclub_id_role_id', ['bookclub_id', 'role', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('memberships', schema=None) as batch_op:
+        batch_op.drop_index('ix_memberships_bookclub_id_role_id')
+        batch_op.drop_index('ix_memberships_bookclub_id_id')
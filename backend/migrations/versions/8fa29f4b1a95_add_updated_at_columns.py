@@ -0,0 +1,39 @@
+"""Add updated_at to books, bookclubs and book_rating_stats
+
+Revision ID: 8fa29f4b1a95
+Revises: 18f32355c05a
+Create Date: 2026-10-18 13:58:07.402519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8fa29f4b1a95'
+down_revision = '18f32355c05a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('books', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('bookclubs', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('book_rating_stats', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE books SET updated_at = date_added")
+    op.execute("UPDATE bookclubs SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE book_rating_stats SET updated_at = CURRENT_TIMESTAMP")
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+    with op.batch_alter_table('bookclubs', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+    with op.batch_alter_table('book_rating_stats', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    op.drop_column('book_rating_stats', 'updated_at')
+    op.drop_column('bookclubs', 'updated_at')
+    op.drop_column('books', 'updated_at')
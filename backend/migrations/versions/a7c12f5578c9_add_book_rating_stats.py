@@ -0,0 +1,50 @@
+"""Add book_rating_stats table
+
+Revision ID: a7c12f5578c9
+Revises: 81eaa943a958
+Create Date: 2026-10-18 10:58:31.640982
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c12f5578c9'
+down_revision = '81eaa943a958'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('book_rating_stats',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('rating_1', sa.Integer(), nullable=False),
+    sa.Column('rating_2', sa.Integer(), nullable=False),
+    sa.Column('rating_3', sa.Integer(), nullable=False),
+    sa.Column('rating_4', sa.Integer(), nullable=False),
+    sa.Column('rating_5', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+
+    # Seed from existing reviews; `flask books rebuild-rating-stats` repeats this
+    op.execute("""
+        INSERT INTO book_rating_stats
+            (book_id, review_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+        SELECT book_id, COUNT(*), SUM(rating),
+               SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating = 3 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating = 5 THEN 1 ELSE 0 END)
+        FROM reviews
+        WHERE rating BETWEEN 1 AND 5
+        GROUP BY book_id
+    """)
+
+
+def downgrade():
+    op.drop_table('book_rating_stats')
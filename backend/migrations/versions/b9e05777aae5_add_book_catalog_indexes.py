@@ -0,0 +1,40 @@
+"""Add book catalog indexes
+
+Revision ID: b9e05777aae5
+Revises: 7a672eb4dbd8
+Create Date: 2026-10-18 09:12:40.118205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e05777aae5'
+down_revision = '7a672eb4dbd8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keyset pagination requires a total order on (date_added, id)
+    op.execute("UPDATE books SET date_added = CURRENT_TIMESTAMP WHERE date_added IS NULL")
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.alter_column('date_added', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_books_date_added_id', ['date_added', 'id'], unique=False)
+        batch_op.create_index('ix_books_language', ['language'], unique=False)
+        batch_op.create_index('ix_books_pages', ['pages'], unique=False)
+        batch_op.create_index('ix_books_rating', ['rating'], unique=False)
+
+    op.create_index('ix_books_author_lower', 'books', [sa.text('lower(author)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_books_author_lower', table_name='books')
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.drop_index('ix_books_rating')
+        batch_op.drop_index('ix_books_pages')
+        batch_op.drop_index('ix_books_language')
+        batch_op.drop_index('ix_books_date_added_id')
+        batch_op.alter_column('date_added', existing_type=sa.DateTime(), nullable=True)
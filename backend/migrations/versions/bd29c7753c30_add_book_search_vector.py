@@ -0,0 +1,53 @@
+"""Add book search vector
+
+Revision ID: bd29c7753c30
+Revises: b9e05777aae5
+Create Date: 2026-10-18 09:47:03.552117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'bd29c7753c30'
+down_revision = 'b9e05777aae5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        # Other backends search through the in-process index instead
+        op.add_column('books', sa.Column('search_vector', sa.Text(), nullable=True))
+        return
+
+    op.add_column('books', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute("""
+        CREATE FUNCTION books_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.author, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(NEW.synopsis, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER books_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, author, synopsis ON books
+        FOR EACH ROW EXECUTE FUNCTION books_search_vector_update()
+    """)
+    # Touch every row once so the trigger populates existing books
+    op.execute("UPDATE books SET title = title")
+    op.create_index('ix_books_search_vector', 'books', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_books_search_vector', table_name='books', postgresql_using='gin')
+        op.execute("DROP TRIGGER books_search_vector_trigger ON books")
+        op.execute("DROP FUNCTION books_search_vector_update()")
+    op.drop_column('books', 'search_vector')
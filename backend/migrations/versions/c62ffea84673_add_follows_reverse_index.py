@@ -0,0 +1,26 @@
+"""Add follows (followed_id, follower_id) index
+
+Revision ID: c62ffea84673
+Revises: 6c38d8f472be
+Create Date: 2026-10-18 17:28:59.545937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c62ffea84673'
+down_revision = '6c38d8f472be'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('follows', schema=None) as batch_op:
+        batch_op.create_index('ix_follows_followed_id_follower_id', ['followed_id', 'follower_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('follows', schema=None) as batch_op:
+        batch_op.drop_index('ix_follows_followed_id_follower_id')
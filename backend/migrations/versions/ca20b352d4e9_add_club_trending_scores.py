@@ -0,0 +1,36 @@
+"""Add club_trending_scores table
+
+Revision ID: ca20b352d4e9
+Revises: 18810a54b819
+Create Date: 2026-10-18 17:27:38.383151
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ca20b352d4e9'
+down_revision = '18810a54b819'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by `flask clubs update-trending --full`
+    op.create_table('club_trending_scores',
+    sa.Column('bookclub_id', sa.Integer(), nullable=False),
+    sa.Column('log_score', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['bookclub_id'], ['bookclubs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('bookclub_id')
+    )
+    with op.batch_alter_table('club_trending_scores', schema=None) as batch_op:
+        batch_op.create_index('ix_club_trending_scores_log_score', ['log_score'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('club_trending_scores', schema=None) as batch_op:
+        batch_op.drop_index('ix_club_trending_scores_log_score')
+
+    op.drop_table('club_trending_scores')
@@ -0,0 +1,40 @@
+"""Make (bookclub_id, user_id) unique on memberships
+
+Revision ID: d3afacf1022f
+Revises: de6e2ddadfc8
+Create Date: 2026-10-18 17:23:45.180909
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3afacf1022f'
+down_revision = 'de6e2ddadfc8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the earliest membership of any user who joined the same club twice
+    op.execute("""
+        DELETE FROM memberships
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM memberships GROUP BY bookclub_id, user_id
+        )
+    """)
+    op.execute("""
+        UPDATE bookclubs
+        SET member_count = (
+            SELECT COUNT(*) FROM memberships WHERE memberships.bookclub_id = bookclubs.id
+        )
+    """)
+
+    with op.batch_alter_table('memberships', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_memberships_bookclub_id_user_id', ['bookclub_id', 'user_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('memberships', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_memberships_bookclub_id_user_id', type_='unique')
@@ -0,0 +1,60 @@
+"""Add club_events activity log
+
+Revision ID: de6e2ddadfc8
+Revises: 0ba6958cfc7d
+Create Date: 2026-10-18 16:12:45.207193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'de6e2ddadfc8'
+down_revision = '0ba6958cfc7d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('club_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('bookclub_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=40), nullable=False),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('subject_id', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['bookclub_id'], ['bookclubs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['actor_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('club_events', schema=None) as batch_op:
+        batch_op.create_index('ix_club_events_bookclub_id_id', ['bookclub_id', 'id'], unique=False)
+
+    # Seed feeds with existing history, oldest first so ids follow time
+    op.execute("""
+        INSERT INTO club_events (bookclub_id, event_type, actor_id, subject_id, created_at)
+        SELECT bookclub_id, event_type, actor_id, subject_id, created_at FROM (
+            SELECT id AS bookclub_id, 'club_created' AS event_type, owner_id AS actor_id,
+                   NULL AS subject_id, created_at
+            FROM bookclubs
+            UNION ALL
+            SELECT bookclub_id, 'member_joined', user_id, user_id, COALESCE(joined_at, CURRENT_TIMESTAMP)
+            FROM memberships
+            UNION ALL
+            SELECT bookclub_id, 'summary_posted', user_id, id, COALESCE(created_at, CURRENT_TIMESTAMP)
+            FROM summaries WHERE bookclub_id IS NOT NULL
+            UNION ALL
+            SELECT bookclub_id, 'meeting_scheduled', creator_id, id, COALESCE(created_at, CURRENT_TIMESTAMP)
+            FROM meetings WHERE bookclub_id IS NOT NULL
+        ) AS history
+        ORDER BY created_at
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('club_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_club_events_bookclub_id_id')
+
+    op.drop_table('club_events')
@@ -0,0 +1,57 @@
+"""Add book normalized_key for duplicate detection
+
+Revision ID: ed79224ffa97
+Revises: a7c12f5578c9
+Create Date: 2026-10-18 12:36:14.803551
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.book import Book
+
+
+# revision identifiers, used by Alembic.
+revision = 'ed79224ffa97'
+down_revision = 'a7c12f5578c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('normalized_key', sa.String(length=255), nullable=True))
+        batch_op.create_index('ix_books_normalized_key', ['normalized_key'], unique=False)
+
+    # Backfill with the same normalization the application applies on write
+    books = sa.table('books',
+        sa.column('id', sa.Integer),
+        sa.column('title', sa.String),
+        sa.column('author', sa.String),
+        sa.column('normalized_key', sa.String)
+    )
+    rows = bind.execute(sa.select(books.c.id, books.c.title, books.c.author)).fetchall()
+    for start in range(0, len(rows), 1000):
+        bind.execute(
+            books.update().where(books.c.id == sa.bindparam('book_id')),
+            [{'book_id': row.id, 'normalized_key': Book.duplicate_key(row.title, row.author)}
+             for row in rows[start:start + 1000]]
+        )
+
+    if bind.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_books_normalized_key_trgm', 'books', ['normalized_key'], unique=False,
+            postgresql_using='gin', postgresql_ops={'normalized_key': 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_books_normalized_key_trgm', table_name='books')
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.drop_index('ix_books_normalized_key')
+        batch_op.drop_column('normalized_key')
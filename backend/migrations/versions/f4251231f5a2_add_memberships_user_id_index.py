@@ -0,0 +1,26 @@
+"""Add memberships user_id index
+
+Revision ID: f4251231f5a2
+Revises: c62ffea84673
+Create Date: 2026-10-18 17:31:06.235540
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4251231f5a2'
+down_revision = 'c62ffea84673'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('memberships', schema=None) as batch_op:
+        batch_op.create_index('ix_memberships_user_id', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('memberships', schema=None) as batch_op:
+        batch_op.drop_index('ix_memberships_user_id')
@@ -2,6 +2,7 @@ from app import create_app, db
 from app.models.book import Book
 from app.models.summary import Summary
 from app.models.review import Review
+from app.models.book_rating_stats import BookRatingStats
 from app.models.bookclub import BookClub
 from app.models.user import User
 from app.models.invite import Invite, InviteStatus
@@ -34,9 +35,11 @@ def clear_database():
      
        # Define tables in proper deletion order to respect foreign keys
        tables_to_clear = [
-           'invite', 'reviews', 'summaries',
+           'invite', 'book_rating_stats', 'book_similarities', 'job_watermarks', 'reading_progress',
+           'club_events', 'club_daily_stats', 'club_trending_scores', 'timeline_entries',
+           'reviews', 'summaries',
            'meetings', 'follows', 'memberships',
-           'bookclubs', 'books', 'users'
+           'bookclubs', 'book_genres', 'books', 'users'
        ]
      
        # Disable foreign key checks (alternative approach)
@@ -555,6 +558,7 @@ def seed_follows(users):
  
    if follows_data:
        db.session.execute(follows_table.insert(), follows_data)
+       User.reconcile_follow_counts()
        db.session.commit()
    return follows_data
 
@@ -670,6 +674,9 @@ def seed_reviews(users, books):
  
    db.session.add_all(reviews)
    db.session.commit()
+
+   BookRatingStats.rebuild()
+   db.session.commit()
    return reviews
 
 